@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import datetime
+import random
+from types import SimpleNamespace
+
+from src.adapters.football_api.models import GETFixturesResponse
+from src.adapters.football_api.models import GETPlayerResponse
+from src.adapters.football_api.models import GETTeamInformationResponse
+from src.shared.utils.emoji import COUNTRIES_TO_FLAGS_MAP
+from src.shared.utils.time import get_utc_now
+
+# keeps synthetic rows well clear of real football api ids, the benchmarks still check before writing any
+BENCHMARK_ID_OFFSET = 900_000
+
+
+def make_team_responses(n: int) -> list[GETTeamInformationResponse]:
+    return [
+        {
+            "team": {"id": BENCHMARK_ID_OFFSET + i, "name": name, "code": name[:3].upper()},
+            "venue": {},
+        }
+        for i, name in enumerate(list(COUNTRIES_TO_FLAGS_MAP)[:n])
+    ]
+
+
+def make_fixture_responses(
+    teams: list[GETTeamInformationResponse], n: int, seed: int = 0
+) -> list[GETFixturesResponse]:
+    rng = random.Random(seed)
+    now = get_utc_now().replace(minute=0, second=0, microsecond=0)
+    fixtures = []
+    for i in range(n):
+        home, away = rng.sample(teams, 2)
+        # half already played, half still to come, a few of each on any given day
+        kick_off = now + datetime.timedelta(hours=6 * (i - n // 2))
+        finished = kick_off < now
+        home_goals = rng.randrange(5) if finished else None
+        away_goals = rng.randrange(5) if finished else None
+        decided = finished and home_goals != away_goals
+        fixtures.append(
+            {
+                "fixture": {
+                    # real fixture ids are already well past the offset, but never negative
+                    "id": -(i + 1),
+                    "date": kick_off.isoformat(),
+                    "status": {"short": "FT" if finished else "NS"},
+                    "venue": {"city": "City", "name": "Stadium"},
+                },
+                "league": {"round": f"Group Stage - {i % 3 + 1}"},
+                "teams": {
+                    "home": {
+                        "id": home["team"]["id"],
+                        "name": home["team"]["name"],
+                        "winner": home_goals > away_goals if decided else None,
+                    },
+                    "away": {
+                        "id": away["team"]["id"],
+                        "name": away["team"]["name"],
+                        "winner": away_goals > home_goals if decided else None,
+                    },
+                },
+                "goals": {"home": home_goals, "away": away_goals},
+                "score": {
+                    "halftime": {"home": None, "away": None},
+                    "fulltime": {"home": home_goals, "away": away_goals},
+                    "extratime": {"home": None, "away": None},
+                    "penalty": {"home": None, "away": None},
+                },
+            }
+        )
+    return fixtures
+
+
+def make_users(n: int) -> list[SimpleNamespace]:
+    # shaped like the pyrogram users the telegram api hands out, with ids telegram never uses
+    return [SimpleNamespace(id=-(i + 1), first_name=f"User{i}", last_name=None, username=None) for i in range(n)]
+
+
+def make_draws(users: list[SimpleNamespace], teams: list[GETTeamInformationResponse]) -> dict[int, list[int]]:
+    draws = {}
+    for i, team in enumerate(teams):
+        draws.setdefault(users[i % len(users)].id, []).append(team["team"]["id"])
+    return draws
+
+
+def make_player_responses(teams: list[GETTeamInformationResponse], n: int, seed: int = 0) -> list[GETPlayerResponse]:
+    rng = random.Random(seed)
+    return [
+        {
+            "player": {
+                "id": BENCHMARK_ID_OFFSET + i,
+                "firstname": f"First{i}",
+                "lastname": f"Last{i}",
+                "birth": {"date": str(datetime.date(1985, 1, 1) + datetime.timedelta(days=rng.randrange(7_000)))},
+            },
+            "statistics": [
+                {
+                    "team": {"id": teams[i % len(teams)]["team"]["id"]},
+                    "cards": {
+                        "yellow": rng.choice([None, 0, 1, 2]),
+                        "yellowred": rng.choice([None, 0, 1]),
+                        "red": rng.choice([None, 0, 1]),
+                    },
+                    "goals": {"total": rng.choice([None, 0, 0, 1, 2])},
+                }
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def bump_player_responses(players: list[GETPlayerResponse], fraction: float, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    for player in rng.sample(players, int(len(players) * fraction)):
+        player["statistics"][0]["goals"]["total"] = (player["statistics"][0]["goals"]["total"] or 0) + 1
+
+
+def bump_fixture_responses(fixtures: list[GETFixturesResponse], fraction: float, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    finished = [fixture for fixture in fixtures if fixture["fixture"]["status"]["short"] == "FT"]
+    for fixture in rng.sample(finished, int(len(finished) * fraction)):
+        fixture["goals"]["home"] += 1
+        fixture["score"]["fulltime"]["home"] += 1
+        home_goals, away_goals = fixture["goals"]["home"], fixture["goals"]["away"]
+        fixture["teams"]["home"]["winner"] = home_goals > away_goals if home_goals != away_goals else None
+        fixture["teams"]["away"]["winner"] = away_goals > home_goals if home_goals != away_goals else None
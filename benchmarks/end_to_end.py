@@ -0,0 +1,222 @@
+"""Drives ingestion and the command paths of App end to end and reports their throughput, latency and query counts.
+
+Runs against the database configured by POSTGRES_URL with a fake football api and telegram client, so nothing goes
+over the network. Exactly the synthetic rows it wrote are removed again afterwards, and the team stats and sweepstake
+standings rebuilt from whatever is left, so it is still best pointed at a scratch database. The report is JSON on
+stdout, for comparing between commits:
+
+    python -m benchmarks.end_to_end --teams 32 --fixtures 64 --players 800 --users 16 --runs 50 > before.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from contextlib import suppress
+from types import SimpleNamespace
+from typing import Awaitable
+from typing import Callable
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy import event
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from benchmarks.data import bump_fixture_responses
+from benchmarks.data import bump_player_responses
+from benchmarks.data import make_draws
+from benchmarks.data import make_fixture_responses
+from benchmarks.data import make_player_responses
+from benchmarks.data import make_team_responses
+from benchmarks.data import make_users
+from benchmarks.fakes import FakeFootballAPI
+from benchmarks.fakes import FakeTelegramAPI
+from src.adapters.football_api.models import GETFixturesResponse
+from src.adapters.football_api.models import GETPlayerResponse
+from src.adapters.football_api.models import GETTeamInformationResponse
+from src.app import App
+from src.shared.db.api import get_engine
+from src.shared.db.api import get_session
+from src.shared.db.cache import get_reference_data_cache
+from src.shared.tables import DrawTable
+from src.shared.tables import FixtureEventTable
+from src.shared.tables import FixtureTable
+from src.shared.tables import PlayerTable
+from src.shared.tables import SweepstakeStandingTable
+from src.shared.tables import TeamTable
+from src.shared.tables import UserTable
+from src.shared.utils.time import get_utc_now
+
+COMMAND_TABLES = ["fixture", "team", "user", "draw", "sweepstake_standing"]
+
+
+class OperationStats(BaseModel):
+    runs: int
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+    queries_per_run: float
+
+
+class QueryCounter:
+    count: int
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+async def measure(
+    run: Callable[[], Awaitable],
+    runs: int,
+    queries: QueryCounter,
+    before: Callable[[], None] | None = None,
+) -> OperationStats:
+    latencies = []
+    start_queries = queries.count
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        await run()
+        latencies.append(time.perf_counter() - start)
+    return OperationStats(
+        runs=runs,
+        throughput=runs / sum(latencies),
+        p50_ms=percentile(latencies, 0.5) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        queries_per_run=(queries.count - start_queries) / runs,
+    )
+
+
+def get_benchmark_rows(
+    teams: list[GETTeamInformationResponse],
+    fixtures: list[GETFixturesResponse],
+    players: list[GETPlayerResponse],
+    users: list[SimpleNamespace],
+) -> list[tuple[InstrumentedAttribute, list[int]]]:
+    # exactly the rows a run writes, in the order they can be deleted in
+    football_api_team_ids = [team["team"]["id"] for team in teams]
+    football_api_fixture_ids = [fixture["fixture"]["id"] for fixture in fixtures]
+    football_api_player_ids = [player["player"]["id"] for player in players]
+    telegram_api_user_ids = [user.id for user in users]
+    return [
+        (SweepstakeStandingTable.football_api_team_id, football_api_team_ids),
+        (FixtureEventTable.football_api_fixture_id, football_api_fixture_ids),
+        (FixtureTable.football_api_fixture_id, football_api_fixture_ids),
+        (PlayerTable.football_api_player_id, football_api_player_ids),
+        (DrawTable.telegram_api_user_id, telegram_api_user_ids),
+        (UserTable.telegram_api_user_id, telegram_api_user_ids),
+        (TeamTable.football_api_team_id, football_api_team_ids),
+    ]
+
+
+async def get_existing_tables(rows: list[tuple[InstrumentedAttribute, list[int]]]) -> list[str]:
+    async with get_session() as session:
+        return [
+            column.class_.__tablename__
+            for column, ids in rows
+            if (await session.execute(select(func.count()).where(column.in_(ids)))).scalar()
+        ]
+
+
+async def delete_benchmark_rows(rows: list[tuple[InstrumentedAttribute, list[int]]]) -> None:
+    async with get_session() as session:
+        for column, ids in rows:
+            await session.execute(delete(column.class_).where(column.in_(ids)))
+        await session.commit()
+    get_reference_data_cache().invalidate()
+
+
+async def main(n_teams: int, n_fixtures: int, n_players: int, n_users: int, runs: int) -> None:
+    teams = make_team_responses(n_teams)
+    fixtures = make_fixture_responses(teams, n_fixtures)
+    players = make_player_responses(teams, n_players)
+    users = make_users(n_users)
+    app = App(telegram_api=FakeTelegramAPI(users), football_api=FakeFootballAPI(teams, fixtures, players))
+
+    rows = get_benchmark_rows(teams, fixtures, players, users)
+    if existing_tables := await get_existing_tables(rows):
+        # whatever is there isn't ours to delete, it could be real data or a crashed run someone wants to look at
+        raise SystemExit(f"rows with the benchmark's ids already exist in {existing_tables}, remove them first")
+
+    queries = QueryCounter()
+    event.listen(get_engine().sync_engine, "before_cursor_execute", queries)
+    # the app logs every step, which would otherwise end up in what is measured
+    logger.remove()
+
+    def invalidate_commands() -> None:
+        app.command_cache.invalidate(*COMMAND_TABLES)
+
+    def bump_fixtures() -> None:
+        bump_fixture_responses(fixtures, fraction=0.1, seed=time.perf_counter_ns())
+
+    def bump_players() -> None:
+        bump_player_responses(players, fraction=0.1, seed=time.perf_counter_ns())
+
+    today = get_utc_now().date()
+    telegram_api_user_ids = itertools.cycle([user.id for user in users])
+
+    async def get_date_context() -> None:
+        _ = (await app.get_date_context(today)).message
+
+    async def get_user_context() -> None:
+        _ = (await app.get_user_context(next(telegram_api_user_ids))).matches_message
+
+    async def get_sweepstake_context() -> None:
+        _ = (await app.get_sweepstake_context()).message
+
+    operations = {}
+    try:
+        await app.ingest_users()
+        await app.ingest_teams()
+        await app.database_api.add_draws(make_draws(users, teams))
+
+        operations["ingest_fixtures (insert)"] = await measure(app.ingest_fixtures, 1, queries)
+        operations["ingest_fixtures (unchanged)"] = await measure(app.ingest_fixtures, runs, queries)
+        operations["ingest_fixtures (10% changed)"] = await measure(app.ingest_fixtures, runs, queries, bump_fixtures)
+        operations["ingest_players (insert)"] = await measure(app.ingest_players, 1, queries)
+        operations["ingest_players (unchanged)"] = await measure(app.ingest_players, runs, queries)
+        operations["ingest_players (10% changed)"] = await measure(app.ingest_players, runs, queries, bump_players)
+
+        for name, run in [
+            ("get_date_context", get_date_context),
+            ("get_user_context", get_user_context),
+            ("get_sweepstake_context", get_sweepstake_context),
+        ]:
+            operations[f"{name} (uncached)"] = await measure(run, runs, queries, invalidate_commands)
+            operations[f"{name} (cached)"] = await measure(run, runs, queries)
+    finally:
+        await delete_benchmark_rows(rows)
+        with suppress(Exception):
+            await app.database_api.refresh_team_stats()
+            await app.update_sweepstake_standings()
+        event.remove(get_engine().sync_engine, "before_cursor_execute", queries)
+
+    report = {
+        "sizes": {"teams": n_teams, "fixtures": n_fixtures, "players": n_players, "users": n_users, "runs": runs},
+        "operations": {name: stats.model_dump() for name, stats in operations.items()},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--fixtures", type=int, default=64)
+    parser.add_argument("--players", type=int, default=800)
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.teams, args.fixtures, args.players, args.users, args.runs))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import datetime
+from types import SimpleNamespace
+from typing import AsyncIterator
+
+from src.adapters.football_api.models import GETFixturesResponse
+from src.adapters.football_api.models import GETPlayerResponse
+from src.adapters.football_api.models import GETTeamInformationResponse
+from src.adapters.football_api.quota import FootballAPIQuota
+from src.shared.utils.time import get_utc_now
+
+
+class FakeFootballAPI:
+    # serves canned responses in place of FootballAPI, counting requests the way the real one would make them
+    quota: FootballAPIQuota
+    requests_made: int
+
+    def __init__(
+        self,
+        teams: list[GETTeamInformationResponse],
+        fixtures: list[GETFixturesResponse],
+        players: list[GETPlayerResponse],
+        players_per_page: int = 20,
+    ) -> None:
+        self.teams = teams
+        self.fixtures = fixtures
+        self.players = players
+        self.players_per_page = players_per_page
+
+        self.quota = FootballAPIQuota()
+        self.requests_made = 0
+
+    async def get_teams(self) -> list[GETTeamInformationResponse]:
+        self.requests_made += 1
+        return self.teams
+
+    async def get_fixtures(self, since: datetime.date | None = None) -> list[GETFixturesResponse]:
+        self.requests_made += 1
+        if since is not None:
+            today = str(get_utc_now().date())
+            return [fixture for fixture in self.fixtures if str(since) <= fixture["fixture"]["date"][:10] <= today]
+        return self.fixtures
+
+    async def get_fixture_events(self, fixture_football_api_id: int) -> list:
+        self.requests_made += 1
+        return []
+
+    async def iter_player_pages(self, max_pages_in_flight: int = 8) -> AsyncIterator[list[GETPlayerResponse]]:
+        for i in range(0, len(self.players), self.players_per_page):
+            self.requests_made += 1
+            yield self.players[i : i + self.players_per_page]
+
+    async def get_players(self) -> list[GETPlayerResponse]:
+        return [player async for page in self.iter_player_pages() for player in page]
+
+
+class FakeTelegramAPI:
+    # stands in for TelegramAPI without connecting anywhere, whatever is sent or replied is kept in sent_messages
+    users: list[SimpleNamespace]
+    sent_messages: list[tuple[int, str]]
+
+    def __init__(self, users: list[SimpleNamespace], chat_id: int = 0) -> None:
+        self.users = users
+        self.chat_id = chat_id
+        self.sent_messages = []
+
+    def on_message(self, *args, **kwargs) -> callable:
+        return lambda func: func
+
+    def on_chat_member_updated(self, *args, **kwargs) -> callable:
+        return lambda func: func
+
+    async def get_chat_users(self) -> list[SimpleNamespace]:
+        return self.users
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        # Message.reply lands here too, with the reply options as keyword arguments
+        self.sent_messages.append((chat_id, text))
+
+    async def send_chat_message(self, message: str) -> None:
+        await self.send_message(self.chat_id, message)
@@ -0,0 +1,160 @@
+"""Fires synthetic slash commands at the handlers registered in src/api.py and reports how well the bot keeps up.
+
+Every message goes through the real handler and the database configured by POSTGRES_URL, but replies are recorded
+by a fake telegram client instead of being sent. Commands go out at --rate per second with at most --concurrency in
+flight, like that many group members typing at once, so latencies include the wait for a free slot. The report is
+JSON on stdout:
+
+    python -m benchmarks.load_test --commands categories matchestoday --rate 50 --concurrency 20 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from pyrogram.enums import ChatType
+from pyrogram.enums import MessageEntityType
+from pyrogram.types import Chat
+from pyrogram.types import Message
+from pyrogram.types import MessageEntity
+from pyrogram.types import User
+
+from benchmarks.end_to_end import percentile
+from benchmarks.fakes import FakeTelegramAPI
+from src.api import app
+from src.app import BotSlashCommand
+from src.config import get_config
+from src.shared.db.api import PoolMetrics
+from src.shared.db.api import get_pool_metrics
+
+LOOP_LAG_INTERVAL = 0.01
+POOL_SAMPLE_INTERVAL = 0.05
+
+
+def make_message(
+    client: FakeTelegramAPI,
+    message_id: int,
+    command: BotSlashCommand,
+    args: list[str],
+    telegram_api_user_id: int,
+) -> Message:
+    return Message(
+        id=message_id,
+        chat=Chat(id=client.chat_id, type=ChatType.SUPERGROUP),
+        from_user=User(id=telegram_api_user_id, first_name="Load"),
+        text=" ".join([f"/{command}", *args]),
+        entities=[MessageEntity(type=MessageEntityType.BOT_COMMAND, offset=0, length=len(command) + 1)],
+        # normally set by filters.command, which is skipped when the handlers are called directly
+        command=[str(command), *args],
+        client=client,
+    )
+
+
+def summarise(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "p50_ms": percentile(values, 0.5) * 1000,
+        "p90_ms": percentile(values, 0.9) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+async def monitor_loop_lag(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL))
+
+
+async def monitor_pool(samples: list[PoolMetrics], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        samples.append(get_pool_metrics())
+        await asyncio.sleep(POOL_SAMPLE_INTERVAL)
+
+
+async def main(commands: list[BotSlashCommand], rate: float, concurrency: int, duration: float, seed: int) -> None:
+    await app.database_api.warm_up()
+    reference_data = await app.database_api.get_reference_data()
+    telegram_api_user_ids = list(reference_data.users_by_telegram_api_user_id) or [0]
+    team_names = list(reference_data.teams_by_name) or ["Spain"]
+
+    rng = random.Random(seed)
+    client = FakeTelegramAPI(users=[], chat_id=get_config().TELEGRAM_CHAT_ID)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: dict[BotSlashCommand, list[float]] = {command: [] for command in commands}
+    errors: dict[BotSlashCommand, int] = {command: 0 for command in commands}
+
+    async def send(message: Message, command: BotSlashCommand, scheduled_at: float) -> None:
+        async with semaphore:
+            try:
+                await app.command_handlers[command](client, message)
+            except Exception:
+                errors[command] += 1
+            finally:
+                latencies[command].append(time.perf_counter() - scheduled_at)
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    pool_samples: list[PoolMetrics] = []
+    monitors = [
+        asyncio.create_task(monitor_loop_lag(lags, stop)),
+        asyncio.create_task(monitor_pool(pool_samples, stop)),
+    ]
+    pool_before = get_pool_metrics()
+
+    start = time.perf_counter()
+    tasks = []
+    for i in range(int(rate * duration)):
+        # open loop, a slow reply doesn't hold back the next member from sending their command
+        scheduled_at = start + i / rate
+        await asyncio.sleep(max(0.0, scheduled_at - time.perf_counter()))
+        command = commands[i % len(commands)]
+        args = [rng.choice(team_names).lower()] if command == BotSlashCommand.WHO_HAS else []
+        message = make_message(client, i, command, args, rng.choice(telegram_api_user_ids))
+        tasks.append(asyncio.create_task(send(message, command, scheduled_at)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*monitors)
+    pool_after = get_pool_metrics()
+    checkouts = pool_after.checkouts - pool_before.checkouts
+
+    report = {
+        "settings": {"commands": commands, "rate": rate, "concurrency": concurrency, "duration": duration},
+        "sent": len(tasks),
+        "replies": len(client.sent_messages),
+        "elapsed_s": elapsed,
+        "throughput": len(tasks) / elapsed,
+        "commands": {
+            command: {"sent": len(latencies[command]), "errors": errors[command], **summarise(latencies[command])}
+            for command in commands
+        },
+        "loop_lag": summarise(lags),
+        "db_pool": {
+            "checkouts": checkouts,
+            "mean_wait_ms": (pool_after.total_wait - pool_before.total_wait) / checkouts * 1000 if checkouts else 0,
+            "max_wait_ms": pool_after.max_wait * 1000,
+            "max_checked_out": max(sample.checked_out for sample in pool_samples),
+            "max_overflow": max(sample.overflow for sample in pool_samples),
+            "max_utilisation": max(sample.utilisation for sample in pool_samples),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", nargs="+", type=BotSlashCommand, default=list(app.command_handlers))
+    parser.add_argument("--rate", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if unregistered := [command for command in args.commands if command not in app.command_handlers]:
+        parser.error(f"no handler registered for {unregistered}")
+    asyncio.run(main(args.commands, args.rate, args.concurrency, args.duration, args.seed))
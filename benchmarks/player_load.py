@@ -0,0 +1,86 @@
+"""Compares writing players row by row with the COPY staging loader.
+
+Runs against the database configured by POSTGRES_URL, using synthetic teams and players. Exactly the rows it wrote are
+removed again afterwards, and it refuses to start if any of them already exist:
+
+    python -m benchmarks.player_load --players 5000 --teams 24
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from benchmarks.data import bump_player_responses
+from benchmarks.data import make_player_responses
+from benchmarks.data import make_team_responses
+from benchmarks.end_to_end import delete_benchmark_rows
+from benchmarks.end_to_end import get_existing_tables
+from src.adapters.football_api.models import GETPlayerResponse
+from src.shared.db.api import get_database_api
+from src.shared.db.api import get_session
+from src.shared.tables import PlayerTable
+from src.shared.tables import TeamTable
+
+
+async def add_player_row_by_row(response: GETPlayerResponse) -> None:
+    # the path ingest_players took before the COPY loader, kept here as the baseline to compare against
+    async with get_session() as session:
+        try:
+            session.add(PlayerTable.from_football_api_player_response(response))
+            await session.commit()
+        except IntegrityError:
+            await session.flush()
+            await session.rollback()
+            query = (
+                update(PlayerTable)
+                .where(PlayerTable.football_api_player_id == response["player"]["id"])
+                .values(
+                    yellow_cards=response["statistics"][0]["cards"]["yellow"],
+                    yellow_then_red_cards=response["statistics"][0]["cards"]["yellowred"],
+                    red_cards=response["statistics"][0]["cards"]["red"],
+                    goals=response["statistics"][0]["goals"]["total"],
+                )
+            )
+            await session.execute(query)
+            await session.commit()
+
+
+async def main(n_players: int, n_teams: int) -> None:
+    database_api = get_database_api()
+    teams = make_team_responses(n_teams)
+    players = make_player_responses(teams, n_players)
+
+    player_rows = [(PlayerTable.football_api_player_id, [player["player"]["id"] for player in players])]
+    team_rows = [(TeamTable.football_api_team_id, [team["team"]["id"] for team in teams])]
+    if existing_tables := await get_existing_tables(player_rows + team_rows):
+        # whatever is there isn't ours to delete, it could be real data or a crashed run someone wants to look at
+        raise SystemExit(f"rows with the benchmark's ids already exist in {existing_tables}, remove them first")
+
+    try:
+        await database_api.add_teams_from_football_api_team_responses(teams)
+        for run in ("insert", "rewrite"):
+            start = time.perf_counter()
+            for player in players:
+                await add_player_row_by_row(player)
+            print(f"row by row  {run:<10} {n_players} players in {time.perf_counter() - start:.3f}s")
+
+        await delete_benchmark_rows(player_rows)
+        for run in ("insert", "rewrite", "10% bumped"):
+            if run == "10% bumped":
+                bump_player_responses(players, fraction=0.1)
+            start = time.perf_counter()
+            result = await database_api.load_players_from_football_api_player_responses(players)
+            print(f"copy+merge  {run:<10} {n_players} players in {time.perf_counter() - start:.3f}s ({result})")
+    finally:
+        await delete_benchmark_rows(player_rows + team_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=5_000)
+    parser.add_argument("--teams", type=int, default=24)
+    args = parser.parse_args()
+    asyncio.run(main(args.players, args.teams))
@@ -0,0 +1,139 @@
+"""Runs EXPLAIN on the statements behind every DatabaseAPI read and fails when a plan scans a big table sequentially.
+
+Plans are taken with sequential scans disabled, so a Seq Scan left in a plan means that no index can serve the
+query. Runs against the database configured by POSTGRES_URL and exits non-zero on a regression:
+
+    python -m benchmarks.query_plans --min-rows 100
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import suppress
+from typing import Any
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import text
+
+from src.shared.db.api import DatabaseAPI
+from src.shared.db.api import get_engine
+from src.shared.db.api import get_session
+from src.shared.models import FixtureStatusEnum
+from src.shared.tables import FixtureTable
+from src.shared.utils.time import get_utc_now
+
+# reads that go through whole tables on purpose
+FULL_SCANS = {"load_reference_data", "get_players"}
+
+
+def get_queries(football_api_fixture_id: int, telegram_api_user_id: int) -> dict[str, callable]:
+    today = get_utc_now().date()
+    return {
+        "load_reference_data": DatabaseAPI.load_reference_data,
+        "get_fixture_by_football_api_fixture_id": lambda: DatabaseAPI.get_fixture_by_football_api_fixture_id(
+            football_api_fixture_id
+        ),
+        "get_football_api_fixture_ids_by_telegram_api_user_id": lambda: (
+            DatabaseAPI.get_football_api_fixture_ids_by_telegram_api_user_id(telegram_api_user_id)
+        ),
+        "get_fixtures_by_date": lambda: DatabaseAPI.get_fixtures_by_date(today),
+        "get_fixtures_with_stale_events": DatabaseAPI.get_fixtures_with_stale_events,
+        "get_fixture_contexts_by_date": lambda: DatabaseAPI.get_fixture_contexts_by_date(today),
+        "get_fixture_contexts_by_football_api_fixture_ids": lambda: (
+            DatabaseAPI.get_fixture_contexts_by_football_api_fixture_ids([football_api_fixture_id])
+        ),
+        "get_fixture_contexts_by_telegram_api_user_id": lambda: (
+            DatabaseAPI.get_fixture_contexts_by_telegram_api_user_id(
+                telegram_api_user_id, statuses=FixtureStatusEnum.not_started()
+            )
+        ),
+        "get_biggest_loss_fixture_context": DatabaseAPI.get_biggest_loss_fixture_context,
+        "get_worst_team_stats": DatabaseAPI.get_worst_team_stats,
+        "get_filthiest_team_stats": DatabaseAPI.get_filthiest_team_stats,
+        "get_sweepstake_standings": DatabaseAPI.get_sweepstake_standings,
+        "get_completed_fixtures": DatabaseAPI.get_completed_fixtures,
+        "get_in_progress_fixtures": DatabaseAPI.get_in_progress_fixtures,
+        "get_next_kick_off": lambda: DatabaseAPI.get_next_kick_off(get_utc_now()),
+        "get_players": DatabaseAPI.get_players,
+        "get_youngest_goalscorer_player": DatabaseAPI.get_youngest_goalscorer_player,
+        "get_oldest_goalscorer_player": DatabaseAPI.get_oldest_goalscorer_player,
+    }
+
+
+async def get_relation_rows() -> dict[str, float]:
+    async with get_session() as session:
+        # planner statistics are what the row threshold is checked against, so they have to be current
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+        query = text("SELECT relname, reltuples FROM pg_class WHERE relkind IN ('r', 'm')")
+        return dict((await session.execute(query)).tuples().all())
+
+
+async def get_sample_ids() -> tuple[int, int]:
+    async with get_session() as session:
+        query = select(FixtureTable.football_api_fixture_id).limit(1)
+        football_api_fixture_id = (await session.execute(query)).scalar()
+    reference_data = await DatabaseAPI.load_reference_data()
+    telegram_api_user_id = next(iter(reference_data.users_by_telegram_api_user_id), 0)
+    return football_api_fixture_id or 0, telegram_api_user_id
+
+
+async def explain(statement: str, parameters: tuple) -> dict[str, Any]:
+    async with get_session() as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        driver_connection = (await (await session.connection()).get_raw_connection()).driver_connection
+        result = await driver_connection.fetchval(f"EXPLAIN (FORMAT JSON) {statement}", *parameters)
+        (plan,) = json.loads(result) if isinstance(result, str) else result
+        return plan["Plan"]
+
+
+def iter_seq_scans(plan: dict[str, Any]) -> Iterator[str]:
+    if plan["Node Type"] == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from iter_seq_scans(child)
+
+
+async def main(min_rows: int) -> int:
+    relation_rows = await get_relation_rows()
+    queries = get_queries(*await get_sample_ids())
+
+    statements: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, tuple(parameters or ())))
+
+    event.listen(get_engine().sync_engine, "before_cursor_execute", capture)
+    failures = 0
+    for name, query in queries.items():
+        statements.clear()
+        with suppress(AttributeError):
+            await query()
+        captured = list(statements)
+
+        seq_scans = set()
+        for statement, parameters in captured:
+            seq_scans.update(iter_seq_scans(await explain(statement, parameters)))
+        too_big = sorted(r for r in seq_scans if relation_rows.get(r, 0) >= min_rows and name not in FULL_SCANS)
+
+        if too_big:
+            failures += 1
+            scans = ", ".join(f"{r} ({relation_rows[r]:.0f} rows)" for r in too_big)
+            print(f"FAIL {name:<55} seq scan on {scans}")
+        else:
+            print(f"ok   {name:<55} {len(captured)} statements")
+    event.remove(get_engine().sync_engine, "before_cursor_execute", capture)
+
+    print(f"{failures} of {len(queries)} queries scan tables of {min_rows}+ rows sequentially")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-rows", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.min_rows)))
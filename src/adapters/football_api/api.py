@@ -1,21 +1,32 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 from datetime import date
+from datetime import timedelta
 from enum import IntEnum
 from enum import StrEnum
 from functools import lru_cache
 from typing import Any
+from typing import AsyncIterator
 
 import httpx
 from httpx import Headers
 from httpx import Timeout
 
+from src.adapters.football_api.cache import ResponseCache
+from src.adapters.football_api.cache import ResponseCacheMode
 from src.adapters.football_api.models import GETFixturesEventResponse
 from src.adapters.football_api.models import GETFixturesResponse
 from src.adapters.football_api.models import GETPlayerResponse
 from src.adapters.football_api.models import GETTeamInformationResponse
+from src.adapters.football_api.quota import FootballAPIQuota
+from src.adapters.transport import HTTPTransport
+from src.adapters.transport import get_http_transport
 from src.config import get_config
+from src.shared.utils.rate_limit import TokenBucket
+from src.shared.utils.rate_limit import parse_retry_after
+from src.shared.utils.time import get_utc_now
 
 
 class FootballAPILeagueID(IntEnum):
@@ -34,6 +45,15 @@ class FootballAPIEndpoints(StrEnum):
     STANDINGS = "/standings"
 
 
+FOOTBALL_API_ENDPOINT_TTLS = {
+    FootballAPIEndpoints.TEAMS: timedelta(days=3),
+    FootballAPIEndpoints.PLAYERS: timedelta(minutes=30),
+    FootballAPIEndpoints.STANDINGS: timedelta(minutes=10),
+    FootballAPIEndpoints.FIXTURES: timedelta(minutes=1),
+    FootballAPIEndpoints.FIXTURES_EVENTS: timedelta(minutes=1),
+}
+
+
 @lru_cache
 def get_football_api() -> FootballAPI:
     return FootballAPI()
@@ -46,6 +66,12 @@ class FootballAPI:
     api_url: str
     timeout: Timeout
     headers: Headers
+    rate_limiter: TokenBucket
+    max_attempts: int
+    transport: HTTPTransport
+    cache: ResponseCache
+    quota: FootballAPIQuota
+    requests_made: int
 
     def __init__(self) -> None:
         self.league_id = FootballAPILeagueID.EUROS
@@ -59,6 +85,19 @@ class FootballAPI:
                 "X-RapidAPI-Host": "api-football-v1.p.rapidapi.com",
             }
         )
+        self.rate_limiter = TokenBucket(
+            rate=get_config().FOOTBALL_API_REQUESTS_PER_SECOND,
+            daily_limit=get_config().FOOTBALL_API_REQUESTS_PER_DAY,
+        )
+        self.max_attempts = 5
+        self.transport = get_http_transport()
+        self.cache = ResponseCache(
+            directory=get_config().FOOTBALL_API_CACHE_DIR,
+            mode=ResponseCacheMode(get_config().FOOTBALL_API_CACHE_MODE),
+            ttls=FOOTBALL_API_ENDPOINT_TTLS,
+        )
+        self.quota = FootballAPIQuota()
+        self.requests_made = 0
 
     # @retry(stop=stop_after_attempt(5), wait=wait_fixed(2), retry=retry_if_exception_type(HTTPError))
     async def get(
@@ -66,21 +105,39 @@ class FootballAPI:
         url_endpoint: FootballAPIEndpoints,
         params: dict[str, str | int],
     ) -> dict[str, Any]:
-        async with httpx.AsyncClient(timeout=self.timeout, headers=self.headers) as client:
-            resp = await client.get(self.api_url + url_endpoint, params=params)
-            resp.raise_for_status()
-            return resp.json()
+        if (cached := await self.cache.read(url_endpoint, params)) is not None:
+            return cached
+
+        for attempt in range(1, self.max_attempts + 1):
+            await self.rate_limiter.acquire()
+            resp = await self.transport.get(
+                self.api_url + url_endpoint, params=params, headers=self.headers, timeout=self.timeout
+            )
+            self.requests_made += 1
+            self.quota.update_from_headers(resp.headers)
+            if self.quota.limit is not None:
+                self.rate_limiter.daily_limit = self.quota.limit
+                self.rate_limiter.used_today = self.quota.used
+            if resp.status_code != httpx.codes.TOO_MANY_REQUESTS or attempt == self.max_attempts:
+                break
+            self.rate_limiter.slow_down(parse_retry_after(resp.headers.get("Retry-After")))
+        resp.raise_for_status()
+        self.rate_limiter.speed_up()
+        response = resp.json()
+        await self.cache.write(url_endpoint, params, response)
+        return response
 
     async def get_teams(self) -> list[GETTeamInformationResponse]:
         params = {"league": self.league_id, "season": self.season_id}
         response = await self.get(FootballAPIEndpoints.TEAMS, params=params)
         return response["response"]
 
-    async def get_fixtures(self, today_only: bool = False) -> list[GETFixturesResponse]:
+    async def get_fixtures(self, since: date | None = None) -> list[GETFixturesResponse]:
         params = {"league": self.league_id, "season": self.season_id}
-        if today_only:
-            params["from"] = str(date.today())
-            params["to"] = str(date.today())
+        if since is not None:
+            # the api takes the dates in utc unless asked for another timezone
+            params["from"] = str(since)
+            params["to"] = str(get_utc_now().date())
         response = await self.get(FootballAPIEndpoints.FIXTURES, params=params)
         return response["response"]
 
@@ -89,15 +146,27 @@ class FootballAPI:
         response = await self.get(FootballAPIEndpoints.FIXTURES_EVENTS, params=params)
         return response["response"]
 
+    async def iter_player_pages(self, max_pages_in_flight: int = 8) -> AsyncIterator[list[GETPlayerResponse]]:
+        params = {"league": self.league_id, "season": self.season_id}
+        first_page = await self.get(FootballAPIEndpoints.PLAYERS, params={**params, "page": 1})
+        yield first_page["response"]
+
+        def fetch(page: int) -> asyncio.Task:
+            return asyncio.create_task(self.get(FootballAPIEndpoints.PLAYERS, params={**params, "page": page}))
+
+        # pages are yielded as they arrive, so at most max_pages_in_flight of them are held in memory at once
+        pages = iter(range(2, first_page["paging"]["total"] + 1))
+        in_flight = {fetch(page) for page in itertools.islice(pages, max_pages_in_flight)}
+        try:
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if (page := next(pages, None)) is not None:
+                        in_flight.add(fetch(page))
+                    yield task.result()["response"]
+        finally:
+            for task in in_flight:
+                task.cancel()
+
     async def get_players(self) -> list[GETPlayerResponse]:
-        current_page = 1
-        end_page = 1_000_000
-        players = []
-        while current_page <= end_page:
-            params = {"league": self.league_id, "season": self.season_id, "page": current_page}
-            response = await self.get(FootballAPIEndpoints.PLAYERS, params=params)
-            end_page = response["paging"]["total"]
-            players.extend([p for p in response["response"]])
-            current_page += 1
-            await asyncio.sleep(3)
-        return players
+        return [player async for page in self.iter_player_pages() for player in page]
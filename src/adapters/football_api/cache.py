@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import json
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+from src.shared.utils.time import get_utc_now
+
+
+class ResponseCacheMode(StrEnum):
+    OFF = "off"
+    # serve fresh entries and store every response fetched
+    READ_WRITE = "read_write"
+    # always fetch and store every response, e.g. to build a replay set
+    RECORD = "record"
+    # only ever serve stored responses, for offline tests and benchmarks
+    REPLAY = "replay"
+
+
+class ResponseNotRecorded(Exception): ...
+
+
+class ResponseCache:
+    directory: Path
+    mode: ResponseCacheMode
+    ttls: dict[str, datetime.timedelta]
+    default_ttl: datetime.timedelta
+
+    def __init__(
+        self,
+        directory: Path,
+        mode: ResponseCacheMode,
+        ttls: dict[str, datetime.timedelta],
+        default_ttl: datetime.timedelta = datetime.timedelta(minutes=1),
+    ) -> None:
+        self.directory = directory
+        self.mode = mode
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+
+    def get_path(self, endpoint: str, params: dict[str, str | int]) -> Path:
+        key = hashlib.sha256(json.dumps({k: str(v) for k, v in params.items()}, sort_keys=True).encode()).hexdigest()
+        return self.directory / endpoint.strip("/").replace("/", "_") / f"{key}.json"
+
+    def _read(self, endpoint: str, params: dict[str, str | int]) -> dict[str, Any] | None:
+        path = self.get_path(endpoint, params)
+        if not path.exists():
+            if self.mode == ResponseCacheMode.REPLAY:
+                raise ResponseNotRecorded(f"{endpoint} {params} has not been recorded in {self.directory}")
+            return None
+        entry = json.loads(path.read_text())
+        age = get_utc_now() - datetime.datetime.fromisoformat(entry["recorded_at"])
+        if self.mode != ResponseCacheMode.REPLAY and age > self.ttls.get(endpoint, self.default_ttl):
+            return None
+        return entry["response"]
+
+    def _write(self, endpoint: str, params: dict[str, str | int], response: dict[str, Any]) -> None:
+        path = self.get_path(endpoint, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "endpoint": endpoint,
+            "params": {k: str(v) for k, v in params.items()},
+            "recorded_at": get_utc_now().isoformat(),
+            "response": response,
+        }
+        # written aside and renamed so that a crash never leaves a half written entry behind
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(entry))
+        tmp_path.replace(path)
+
+    async def read(self, endpoint: str, params: dict[str, str | int]) -> dict[str, Any] | None:
+        if self.mode in (ResponseCacheMode.OFF, ResponseCacheMode.RECORD):
+            return None
+        return await asyncio.to_thread(self._read, endpoint, params)
+
+    async def write(self, endpoint: str, params: dict[str, str | int], response: dict[str, Any]) -> None:
+        if self.mode in (ResponseCacheMode.OFF, ResponseCacheMode.REPLAY):
+            return
+        await asyncio.to_thread(self._write, endpoint, params, response)
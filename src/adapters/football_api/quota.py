@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import datetime
+from enum import StrEnum
+from typing import Annotated
+
+from httpx import Headers
+from pydantic import BaseModel
+from pydantic import Field
+
+from src.shared.utils.time import get_utc_now
+
+
+class FootballAPIJob(StrEnum):
+    FIXTURES = "fixtures"
+    PLAYERS = "players"
+    EVENTS = "events"
+
+
+class FootballAPIQuota(BaseModel):
+    limit: Annotated[int | None, Field()] = None
+    remaining: Annotated[int | None, Field()] = None
+    reset_at: Annotated[datetime.datetime | None, Field()] = None
+    updated_at: Annotated[datetime.datetime | None, Field()] = None
+
+    @property
+    def used(self) -> int | None:
+        if self.limit is None or self.remaining is None:
+            return None
+        return self.limit - self.remaining
+
+    @property
+    def seconds_until_reset(self) -> float:
+        now = get_utc_now()
+        if self.reset_at and self.reset_at > now:
+            return (self.reset_at - now).total_seconds()
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), now.tzinfo)
+        return (midnight - now).total_seconds()
+
+    def update_from_headers(self, headers: Headers) -> None:
+        # rapidapi reports the plan's daily quota on every response
+        if "x-ratelimit-requests-limit" in headers:
+            self.limit = int(headers["x-ratelimit-requests-limit"])
+        if "x-ratelimit-requests-remaining" in headers:
+            self.remaining = int(headers["x-ratelimit-requests-remaining"])
+        if "x-ratelimit-requests-reset" in headers:
+            self.reset_at = get_utc_now() + datetime.timedelta(seconds=int(headers["x-ratelimit-requests-reset"]))
+        self.updated_at = get_utc_now()
+
+
+class FootballAPIJobBudget(BaseModel):
+    # lower runs first when the budget is tight
+    priority: Annotated[int, Field()]
+    requests_per_run: Annotated[float, Field()]
+    runs_per_day: Annotated[int, Field()]
+
+
+class QuotaPlanner:
+    quota: FootballAPIQuota
+    budgets: dict[FootballAPIJob, FootballAPIJobBudget]
+
+    def __init__(self, quota: FootballAPIQuota, budgets: dict[FootballAPIJob, FootballAPIJobBudget]) -> None:
+        self.quota = quota
+        self.budgets = budgets
+
+    def reserved_for(self, job: FootballAPIJob) -> float:
+        # what the more important jobs are still expected to spend before the quota resets
+        day_left = min(1.0, self.quota.seconds_until_reset / datetime.timedelta(days=1).total_seconds())
+        return sum(
+            budget.requests_per_run * budget.runs_per_day * day_left
+            for budget in self.budgets.values()
+            if budget.priority < self.budgets[job].priority
+        )
+
+    def allows(self, job: FootballAPIJob) -> bool:
+        if self.quota.remaining is None:
+            return True
+        return self.quota.remaining - self.reserved_for(job) >= self.budgets[job].requests_per_run
+
+    def record(self, job: FootballAPIJob, requests: int) -> None:
+        # a moving average, so the estimate follows e.g. the number of player pages growing
+        budget = self.budgets[job]
+        budget.requests_per_run = 0.8 * budget.requests_per_run + 0.2 * requests
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
 from pyrogram import Client
 from pyrogram.types import BotCommand
 from pyrogram.types import Message
@@ -21,9 +24,18 @@ class TelegramAPI(Client):
             bot_token=get_config().TELEGRAM_BOT_TOKEN,
         )
 
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[TelegramAPI, None]:
+        # reuse the running client rather than paying for a new MTProto connection on every call
+        if self.is_connected:
+            yield self
+        else:
+            async with self as app:
+                yield app
+
     async def get_chat_users(self) -> list[User]:
         members = []
-        async with self as app:
+        async with self.session() as app:
             async for member in app.get_chat_members(get_config().TELEGRAM_CHAT_ID):
                 members.append(member.user)
         return members
@@ -32,5 +44,5 @@ class TelegramAPI(Client):
         return await self.send_message(get_config().TELEGRAM_CHAT_ID, message)
 
     async def add_bot_commands(self, bot_commands: list[BotCommand]) -> None:
-        async with self as app:
+        async with self.session() as app:
             await app.set_bot_commands(bot_commands)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import importlib.util
+import time
+from functools import lru_cache
+from typing import Any
+
+import httpx
+from httpx import Limits
+from loguru import logger
+from pydantic import BaseModel
+
+from src.config import get_config
+
+
+@lru_cache
+def get_http_transport() -> HTTPTransport:
+    return HTTPTransport()
+
+
+class HTTPHostMetrics(BaseModel):
+    requests: int = 0
+    new_connections: int = 0
+    total_latency: float = 0
+    max_latency: float = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return self.requests - self.new_connections
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0
+
+    def record(self, latency: float, new_connection: bool) -> None:
+        self.requests += 1
+        self.new_connections += 1 if new_connection else 0
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+
+class HTTPTransport:
+    limits: Limits
+    http2: bool
+    metrics: dict[str, HTTPHostMetrics]
+
+    def __init__(self) -> None:
+        self.limits = Limits(
+            max_connections=get_config().HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=get_config().HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_expiry=get_config().HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.http2 = get_config().HTTP2
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP2 is enabled but h2 is not installed, falling back to HTTP/1.1")
+            self.http2 = False
+        self.metrics = {}
+
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get_client(self, host: str) -> httpx.AsyncClient:
+        # one pool per host, so the connection limits apply per host
+        if host not in self._clients:
+            self._clients[host] = httpx.AsyncClient(limits=self.limits, http2=self.http2)
+        return self._clients[host]
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        host = httpx.URL(url).host
+        new_connection = False
+
+        async def trace(event_name: str, _: dict[str, Any]) -> None:
+            nonlocal new_connection
+            if event_name.endswith("connect_tcp.started"):
+                new_connection = True
+
+        start = time.perf_counter()
+        response = await self.get_client(host).request(method, url, extensions={"trace": trace}, **kwargs)
+        self.metrics.setdefault(host, HTTPHostMetrics()).record(time.perf_counter() - start, new_connection)
+        return response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self) -> None:
+        for host, client in self._clients.items():
+            await client.aclose()
+            logger.info(f"closed http pool: {host=} {self.metrics.get(host)}")
+        self._clients = {}
@@ -2,8 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 
-import httpx
-
+from src.adapters.transport import get_http_transport
 from src.adapters.weather_api.models import Weather
 from src.config import get_config
 
@@ -18,9 +17,8 @@ def get_oweather_api() -> OWeatherAPI:
 class OWeatherAPI:
     @classmethod
     async def get_weather_in(cls, location: str) -> Weather:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                WEATHER_URL,
-                params={"q": location, "appid": get_config().OPEN_WEATHER_MAP_API_KEY},
-            )
+        response = await get_http_transport().get(
+            WEATHER_URL,
+            params={"q": location, "appid": get_config().OPEN_WEATHER_MAP_API_KEY},
+        )
         return Weather.from_response(response.json())
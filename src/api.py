@@ -3,10 +3,12 @@ import datetime
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 
+from src.adapters.football_api.quota import FootballAPIJob
 from src.adapters.telegram_api.api import TelegramAPI
 from src.app import App
 from src.app import BotSlashCommand
 from src.shared.db.api import EntryNotFound
+from src.shared.models import FixtureStatusEnum
 from src.shared.utils.insults import get_insult
 from src.shared.utils.telegram import telegram_tag
 from src.shared.utils.time import get_utc_now
@@ -14,12 +16,22 @@ from src.shared.utils.time import get_utc_now
 app = App()
 
 
-# @app.schedule("0 * * * *")
-# async def update_fixtures() -> None:
-#     await app.ingest_fixtures()
+@app.schedule_adaptive(app.get_fixture_poll_interval, job=FootballAPIJob.FIXTURES)
+async def update_fixtures() -> None:
+    await app.update_fixtures()
+
+
+@app.schedule("0 4 * * *")
+async def update_users() -> None:
+    await app.ingest_users()
+
+
+@app.schedule("15 * * * *", job=FootballAPIJob.EVENTS)
+async def update_fixture_events() -> None:
+    await app.ingest_fixture_events()
 
 
-# @app.schedule("30 * * * *")
+# @app.schedule("30 * * * *", job=FootballAPIJob.PLAYERS)
 # async def update_players() -> None:
 #     await app.ingest_players()
 
@@ -71,19 +83,19 @@ async def insult(_: TelegramAPI, message: Message) -> None:
 
 @app.on_command(BotSlashCommand.MY_TEAMS, description="see your teams")
 async def my_teams(_: TelegramAPI, message: Message) -> None:
-    user_context = await app.get_user_context(message.from_user.id)
+    user_context = await app.get_user_context(message.from_user.id, with_fixtures=False)
     await message.reply(user_context.teams_message)
 
 
 @app.on_command(BotSlashCommand.MY_MATCHES, description="see your upcoming matches")
 async def my_matches(_: TelegramAPI, message: Message) -> None:
-    user_context = await app.get_user_context(message.from_user.id)
+    user_context = await app.get_user_context(message.from_user.id, fixture_statuses=FixtureStatusEnum.not_started())
     await message.reply(user_context.matches_message)
 
 
 @app.on_command(BotSlashCommand.MY_PAST_MATCHES, description="see your past matches")
 async def my_past_matches(_: TelegramAPI, message: Message) -> None:
-    user_context = await app.get_user_context(message.from_user.id)
+    user_context = await app.get_user_context(message.from_user.id, fixture_statuses=FixtureStatusEnum.is_finished())
     await message.reply(user_context.past_matches_message)
 
 
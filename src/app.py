@@ -1,28 +1,85 @@
+import asyncio
 import datetime
+import functools
+from contextlib import aclosing
 from enum import StrEnum
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
 from loguru import logger
 from pyrogram import filters
 from pyrogram.types import BotCommand
+from pyrogram.types import ChatMemberUpdated
 
 from src.adapters.football_api.api import FootballAPI
 from src.adapters.football_api.api import get_football_api
+from src.adapters.football_api.quota import FootballAPIJob
+from src.adapters.football_api.quota import FootballAPIJobBudget
+from src.adapters.football_api.quota import FootballAPIQuota
+from src.adapters.football_api.quota import QuotaPlanner
 from src.adapters.telegram_api.api import TelegramAPI
 from src.adapters.telegram_api.api import get_telegram_api
+from src.adapters.transport import HTTPTransport
+from src.adapters.transport import get_http_transport
+from src.config import get_config
 
 # from src.adapters.weather_api.api import OWeatherAPI
 # from src.adapters.weather_api.api import get_oweather_api
 from src.shared.db.api import DatabaseAPI
 from src.shared.db.api import get_database_api
+from src.shared.db.api import get_pool_metrics
+from src.shared.db.api import unit_of_work
 from src.shared.models import DateContext
 from src.shared.models import FixtureContext
+from src.shared.models import FixtureStatusEnum
+from src.shared.models import IngestResult
 from src.shared.models import SweepstakeCategory
 from src.shared.models import SweepstakeCategoryIDEnum
 from src.shared.models import SweepstakeContext
+from src.shared.models import SweepstakeStanding
+from src.shared.models import SweepstakeStandingChange
+from src.shared.models import Team
+from src.shared.models import User
 from src.shared.models import UserContext
+from src.shared.utils.command_cache import CommandCache
 from src.shared.utils.hardcoded import TELEGRAM_USER_ID_TO_FOOTBALL_API_TEAM_IDS
+from src.shared.utils.stages import Stage
+from src.shared.utils.stages import run_stages
+from src.shared.utils.time import get_utc_now
+
+LIVE_POLL_INTERVAL = datetime.timedelta(minutes=1)
+IDLE_POLL_INTERVAL = datetime.timedelta(hours=3)
+# how long a fixture can stay not started past its kick off before it no longer holds polling at the live interval
+KICK_OFF_GRACE_PERIOD = datetime.timedelta(hours=1)
+
+# the sweepstake categories to recompute when the rows of a table change
+SWEEPSTAKE_CATEGORY_DEPENDENCIES: dict[str, list[SweepstakeCategoryIDEnum]] = {
+    "team": list(SweepstakeCategoryIDEnum),
+    "fixture": [
+        SweepstakeCategoryIDEnum.WORST_TEAM,
+        SweepstakeCategoryIDEnum.TEAM_WITH_BIGGEST_LOSS,
+    ],
+    "player": [
+        SweepstakeCategoryIDEnum.FILTHIEST_TEAM,
+        SweepstakeCategoryIDEnum.YOUNGEST_GOALSCORER,
+        SweepstakeCategoryIDEnum.OLDEST_GOALSCORER,
+    ],
+}
+
+
+def cached_command(*tables: str) -> callable:
+    # for the App methods behind read only commands, until one of the tables they read from is ingested into
+
+    def decorator(func: callable) -> callable:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = (func.__name__, repr(args), repr(sorted(kwargs.items())))
+            return await self.command_cache.get(key, list(tables), lambda: func(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
 
 
 class BotSlashCommand(StrEnum):
@@ -47,37 +104,109 @@ class BotSlashCommand(StrEnum):
 
 class App:
     scheduler: AsyncIOScheduler
+    quota_planner: QuotaPlanner
 
     bot_commands: list[BotCommand]
+    command_handlers: dict[BotSlashCommand, callable]
+    standing_change_handlers: list[callable]
+    command_cache: CommandCache
 
+    http_transport: HTTPTransport
     # oweather_api: OWeatherAPI
     football_api: FootballAPI
     telegram_api: TelegramAPI
     database_api: DatabaseAPI
 
-    def __init__(self) -> None:
+    def __init__(self, telegram_api: TelegramAPI | None = None, football_api: FootballAPI | None = None) -> None:
         self.scheduler = AsyncIOScheduler()
 
         self.bot_commands = []
+        self.command_handlers = {}
+        self.standing_change_handlers = []
+        self.command_cache = CommandCache(ttl=get_config().COMMAND_CACHE_TTL)
 
+        self.http_transport = get_http_transport()
         # self.oweather_api = get_oweather_api()
-        self.telegram_api = get_telegram_api()
-        self.football_api = get_football_api()
+        self.telegram_api = telegram_api or get_telegram_api()
+        self.football_api = football_api or get_football_api()
         self.database_api = get_database_api()
 
-    def schedule(self, cron_expression: str) -> callable:
+        self.telegram_api.on_chat_member_updated(filters.chat(get_config().TELEGRAM_CHAT_ID))(
+            self.on_chat_member_updated
+        )
+
+        self.quota_planner = QuotaPlanner(
+            quota=self.football_api.quota,
+            budgets={
+                FootballAPIJob.FIXTURES: FootballAPIJobBudget(priority=0, requests_per_run=1, runs_per_day=96),
+                FootballAPIJob.EVENTS: FootballAPIJobBudget(priority=1, requests_per_run=4, runs_per_day=24),
+                FootballAPIJob.PLAYERS: FootballAPIJobBudget(priority=2, requests_per_run=40, runs_per_day=24),
+            },
+        )
+
+    @property
+    def football_api_quota(self) -> FootballAPIQuota:
+        return self.football_api.quota
+
+    def on_standing_change(self, func: callable) -> callable:
+        self.standing_change_handlers.append(func)
+        return func
+
+    def schedule(self, cron_expression: str, job: FootballAPIJob | None = None) -> callable:
+
+        def decorator(func: callable) -> callable:
+            self.scheduler.add_job(
+                self.within_budget(job)(func) if job else func,
+                CronTrigger.from_crontab(cron_expression, timezone="UTC"),
+            )
+            return func
+
+        return decorator
+
+    def schedule_adaptive(self, get_interval: callable, job: FootballAPIJob | None = None) -> callable:
 
         def decorator(func: callable) -> callable:
-            self.scheduler.add_job(func, CronTrigger.from_crontab(cron_expression, timezone="UTC"))
+            job_func = self.within_budget(job)(func) if job else func
+
+            async def run() -> None:
+                try:
+                    await job_func()
+                    interval = await get_interval()
+                except Exception:
+                    logger.exception(f"{func.__name__} failed, retrying in {LIVE_POLL_INTERVAL}")
+                    interval = LIVE_POLL_INTERVAL
+                logger.info(f"next {func.__name__} in {interval}")
+                self.scheduler.add_job(run, DateTrigger(run_date=get_utc_now() + interval), misfire_grace_time=None)
+
+            # runs as soon as the scheduler starts, however late that is
+            self.scheduler.add_job(run, misfire_grace_time=None)
             return func
 
         return decorator
 
+    def within_budget(self, job: FootballAPIJob) -> callable:
+
+        def decorator(func: callable) -> callable:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.quota_planner.allows(job):
+                    logger.warning(f"skipping {job}, not enough football api quota left: {self.football_api_quota}")
+                    return None
+                requests_made = self.football_api.requests_made
+                result = await func(*args, **kwargs)
+                self.quota_planner.record(job, self.football_api.requests_made - requests_made)
+                return result
+
+            return wrapper
+
+        return decorator
+
     def on_command(self, command: BotSlashCommand, description: str = "") -> callable:
         self.bot_commands.append(BotCommand(command, description))
 
         def decorator(func: callable) -> callable:
             self.telegram_api.on_message(filters.command(command))(func)
+            self.command_handlers[command] = func
             return func
 
         return decorator
@@ -87,58 +216,196 @@ class App:
 
     async def ingest_users(self) -> None:
         logger.info("ingesting users...")
-        for user in await self.telegram_api.get_chat_users():
-            await self.database_api.add_user_from_pyrogram_user(user)
-        logger.info("users ingested")
+        result = await self.database_api.add_users_from_pyrogram_users(await self.telegram_api.get_chat_users())
+        logger.info(f"users ingested: {result}")
+        await self.on_ingested("user", result)
+
+    async def on_chat_member_updated(self, _: TelegramAPI, update: ChatMemberUpdated) -> None:
+        # keeps users in sync one change at a time, the full ingest_users rescan only runs on a slow cadence
+        if update.new_chat_member and update.new_chat_member.user:
+            result = await self.database_api.add_users_from_pyrogram_users([update.new_chat_member.user])
+            logger.info(f"user updated: {update.new_chat_member.user.id=} {result}")
+            await self.on_ingested("user", result)
 
     async def ingest_teams(self) -> None:
         logger.info("ingesting teams...")
-        for team in await self.football_api.get_teams():
-            await self.database_api.add_team_from_football_api_team_response(team)
-        logger.info("teams ingested")
+        teams = await self.football_api.get_teams()
+        result = await self.database_api.add_teams_from_football_api_team_responses(teams)
+        logger.info(f"teams ingested: {result}")
+        await self.on_ingested("team", result)
 
     async def ingest_draws(self) -> None:
         logger.info("ingesting draws...")
-        for user_id, team_ids in TELEGRAM_USER_ID_TO_FOOTBALL_API_TEAM_IDS.items():
-            for team_id in team_ids:
-                await self.database_api.add_draw(telegram_api_user_id=user_id, football_api_team_id=team_id)
-        logger.info("draws ingested")
-
-    async def ingest_fixtures(self) -> None:
-        logger.info("ingesting fixtures...")
-        for fixture in await self.football_api.get_fixtures():
-            await self.database_api.add_fixture_from_football_api_fixture_response(fixture)
-        logger.info("fixtures ingested")
-
-    async def ingest_players(self) -> None:
+        result = await self.database_api.add_draws(TELEGRAM_USER_ID_TO_FOOTBALL_API_TEAM_IDS)
+        logger.info(f"draws ingested: {result}")
+        await self.on_ingested("draw", result)
+
+    async def ingest_fixtures(self, since: datetime.date | None = None) -> None:
+        logger.info(f"ingesting fixtures: {since=}...")
+        fixtures = await self.football_api.get_fixtures(since=since)
+        result = await self.database_api.add_fixtures_from_football_api_fixture_responses(fixtures)
+        logger.info(f"fixtures ingested: {result}")
+        await self.on_ingested("fixture", result)
+
+    async def ingest_players(self, streaming: bool = True) -> None:
         logger.info("ingesting players...")
-        for player in await self.football_api.get_players():
-            await self.database_api.add_player_from_football_api_player_response(player)
-        logger.info("ingested players")
+        if streaming:
+            # each page is committed on its own, so a failing page keeps everything written before it
+            result = IngestResult()
+            # closed explicitly, so that a failing page doesn't leave the generator suspended mid request
+            try:
+                async with aclosing(self.football_api.iter_player_pages()) as pages:
+                    async for page in pages:
+                        result += await self.database_api.load_players_from_football_api_player_responses(page)
+            except Exception:
+                # the pages written before the failure are in the database, so whatever reads them has to catch up
+                if result.changed:
+                    logger.info(f"ingested players before failing: {result}")
+                    await self.on_ingested("player", result)
+                raise
+        else:
+            result = await self.database_api.load_players_from_football_api_player_responses(
+                await self.football_api.get_players()
+            )
+        logger.info(f"ingested players: {result}")
+        await self.on_ingested("player", result)
+
+    async def ingest_fixture_events(self) -> None:
+        logger.info("ingesting fixture events...")
+        # one request per fixture, so no more than the job's budget per run, oldest first, the next run picks up the rest
+        fixtures = await self.database_api.get_fixtures_with_stale_events(
+            limit=int(self.quota_planner.budgets[FootballAPIJob.EVENTS].requests_per_run)
+        )
+        events = await asyncio.gather(
+            *[self.football_api.get_fixture_events(fixture.football_api_fixture_id) for fixture in fixtures]
+        )
+        result = await self.database_api.add_fixture_events_from_football_api_fixture_event_responses(
+            list(zip(fixtures, events))
+        )
+        logger.info(f"fixture events ingested: {len(fixtures)=} {result}")
+
+    async def on_ingested(self, table: str, result: IngestResult) -> None:
+        if not result.changed:
+            return
+        self.command_cache.invalidate(table)
+        if table not in SWEEPSTAKE_CATEGORY_DEPENDENCIES:
+            return
+        await self.database_api.refresh_team_stats()
+        try:
+            await self.update_sweepstake_standings(SWEEPSTAKE_CATEGORY_DEPENDENCIES[table])
+        except Exception:
+            # the rows are in, stale standings are picked up again by the next change or on startup
+            logger.exception(f"updating sweepstake standings failed: {table=}")
+
+    async def update_sweepstake_standings(self, category_ids: list[SweepstakeCategoryIDEnum] | None = None) -> None:
+        category_ids = category_ids or list(SweepstakeCategoryIDEnum)
+        logger.info(f"updating sweepstake standings: {category_ids=}...")
+        async with unit_of_work():
+            categories = [await self.sweepstake_category_getters[category_id]() for category_id in category_ids]
+            previous_football_api_team_ids = await self.database_api.set_sweepstake_standings(
+                [
+                    SweepstakeStanding(
+                        id=category.id,
+                        prize_money=category.prize_money,
+                        football_api_team_id=category.team.football_api_team_id if category.team else None,
+                        data=category.data,
+                    )
+                    for category in categories
+                ]
+            )
+        self.command_cache.invalidate("sweepstake_standing")
+        logger.info(f"sweepstake standings updated: {previous_football_api_team_ids=}")
+
+        for category in categories:
+            if category.id not in previous_football_api_team_ids:
+                continue
+            previous_team, previous_user = await self.get_team_and_user(previous_football_api_team_ids[category.id])
+            change = SweepstakeStandingChange(
+                category=category, previous_team=previous_team, previous_user=previous_user
+            )
+            for handler in self.standing_change_handlers:
+                try:
+                    await handler(change)
+                except Exception:
+                    logger.exception(f"{handler.__name__} failed: {category.id=}")
+
+    async def get_fixture_poll_interval(self) -> datetime.timedelta:
+        if await self.database_api.get_in_progress_fixtures():
+            return LIVE_POLL_INTERVAL
+        next_kick_off = await self.database_api.get_next_kick_off(get_utc_now() - KICK_OFF_GRACE_PERIOD)
+        if next_kick_off is None:
+            return IDLE_POLL_INTERVAL
+        # wake up for the kick off, and keep polling until the status moves on from not started
+        return min(IDLE_POLL_INTERVAL, max(LIVE_POLL_INTERVAL, next_kick_off - get_utc_now()))
+
+    async def update_fixtures(self) -> None:
+        # while a match is on only the fixtures from the earliest kick off still in progress onwards can change, a match
+        # that started before midnight utc included, otherwise refresh the lot
+        in_progress_fixtures = await self.database_api.get_in_progress_fixtures()
+        since = min(fixture.kick_off for fixture in in_progress_fixtures).date() if in_progress_fixtures else None
+        await self.ingest_fixtures(since=since)
 
     async def on_startup(self) -> None:
         logger.info("starting up...")
-        await self.ingest_users()
-        await self.ingest_teams()
-        await self.ingest_draws()
-        await self.ingest_fixtures()
-        await self.ingest_players()
-        logger.info("started up")
+        results = await run_stages(
+            {
+                "database": Stage(func=self.database_api.warm_up),
+                "users": Stage(func=self.ingest_users),
+                "teams": Stage(func=self.ingest_teams),
+                "draws": Stage(func=self.ingest_draws, depends_on=["users", "teams"]),
+                "fixtures": Stage(func=self.ingest_fixtures, depends_on=["teams"]),
+                "players": Stage(func=self.ingest_players, depends_on=["teams"]),
+                "standings": Stage(func=self.update_sweepstake_standings, depends_on=["draws", "fixtures", "players"]),
+            }
+        )
+        logger.info(f"started up: {list(results.values())}")
+
+    async def on_shutdown(self) -> None:
+        logger.info("shutting down...")
+        await self.http_transport.aclose()
+        logger.info(f"database pool: {get_pool_metrics()}")
+        logger.info(f"command cache: {self.command_cache.metrics}")
+        logger.info("shut down")
 
+    @cached_command("sweepstake_standing", "team", "user", "draw")
     async def get_sweepstake_context(self) -> SweepstakeContext:
         logger.info("getting sweepstake context...")
-        return SweepstakeContext(
-            categories=[
-                await self.get_first_place(),
-                await self.get_second_place(),
-                await self.get_worst_team(),
-                await self.get_filthiest_team(),
-                await self.get_team_with_biggest_loss(),
-                await self.get_youngest_goal_scorer(),
-                await self.get_oldest_goal_scorer(),
-            ]
+        async with unit_of_work(read_only=True):
+            standings = {standing.id: standing for standing in await self.database_api.get_sweepstake_standings()}
+            categories = []
+            for category_id in SweepstakeCategoryIDEnum:
+                if standing := standings.get(category_id):
+                    team, user = await self.get_team_and_user(standing.football_api_team_id)
+                    categories.append(
+                        SweepstakeCategory(
+                            id=standing.id, prize_money=standing.prize_money, team=team, user=user, data=standing.data
+                        )
+                    )
+                else:
+                    # nothing has stored this category yet, e.g. players are never ingested, so work it out live
+                    categories.append(await self.sweepstake_category_getters[category_id]())
+        return SweepstakeContext(categories=categories)
+
+    async def get_team_and_user(self, football_api_team_id: int | None) -> tuple[Team | None, User | None]:
+        if football_api_team_id is None:
+            return None, None
+        return (
+            await self.database_api.get_team_by_football_api_team_id(football_api_team_id),
+            await self.database_api.get_user_by_football_api_team_id(football_api_team_id),
         )
 
+    @property
+    def sweepstake_category_getters(self) -> dict[SweepstakeCategoryIDEnum, callable]:
+        return {
+            SweepstakeCategoryIDEnum.FIRST_PLACE: self.get_first_place,
+            SweepstakeCategoryIDEnum.SECOND_PLACE: self.get_second_place,
+            SweepstakeCategoryIDEnum.WORST_TEAM: self.get_worst_team,
+            SweepstakeCategoryIDEnum.FILTHIEST_TEAM: self.get_filthiest_team,
+            SweepstakeCategoryIDEnum.TEAM_WITH_BIGGEST_LOSS: self.get_team_with_biggest_loss,
+            SweepstakeCategoryIDEnum.YOUNGEST_GOALSCORER: self.get_youngest_goal_scorer,
+            SweepstakeCategoryIDEnum.OLDEST_GOALSCORER: self.get_oldest_goal_scorer,
+        }
+
     async def get_first_place(self) -> SweepstakeCategory:
         return SweepstakeCategory(
             id=SweepstakeCategoryIDEnum.FIRST_PLACE,
@@ -156,219 +423,87 @@ class App:
         )
 
     async def get_worst_team(self) -> SweepstakeCategory:
-        teams_results_map = {
-            team.football_api_team_id: {
-                "team": team,
-                "losses": 0,
-                "goals_scored": 0,
-                "goals_conceded": 0,
-            }
-            for team in await self.database_api.get_teams()
-        }
-
-        for fixture in await self.database_api.get_completed_fixtures():
-            teams_results_map[fixture.home_team_football_api_team_id]["goals_conceded"] += fixture.away_team_goals or 0
-            teams_results_map[fixture.away_team_football_api_team_id]["goals_conceded"] += fixture.home_team_goals or 0
-            teams_results_map[fixture.home_team_football_api_team_id]["losses"] += 1 if fixture.away_team_winner else 0
-            teams_results_map[fixture.away_team_football_api_team_id]["losses"] += 1 if fixture.home_team_winner else 0
-            teams_results_map[fixture.home_team_football_api_team_id]["goals_scored"] += fixture.home_team_goals or 0
-            teams_results_map[fixture.away_team_football_api_team_id]["goals_scored"] += fixture.away_team_goals or 0
-
-        print(teams_results_map)
-        losses = 0
-        worst_teams_results1 = []
-        for team, results_map in teams_results_map.items():
-            if results_map["losses"] > losses:
-                losses = results_map["losses"]
-                worst_teams_results1 = [results_map]
-            elif results_map["losses"] == losses:
-                worst_teams_results1.append(results_map)
-
-        goals_conceded = 0
-        worst_teams_results2 = []
-        for team, results_map in teams_results_map.items():
-            if results_map["goals_conceded"] > goals_conceded:
-                goals_conceded = results_map["goals_conceded"]
-                worst_teams_results2 = [results_map]
-            elif results_map["goals_conceded"] == goals_conceded:
-                worst_teams_results2.append(results_map)
-
-        worst_team_football_api_team_ids = {i["team"].football_api_team_id for i in worst_teams_results1} & {
-            j["team"].football_api_team_id for j in worst_teams_results2
-        }
-        if len(worst_team_football_api_team_ids) > 1:
-            worst_teams = [
-                (worst_team_football_api_team_id, teams_results_map[worst_team_football_api_team_id]["goals_scored"])
-                for worst_team_football_api_team_id in worst_team_football_api_team_ids
-            ]
-            print(worst_teams)
-            worst_team_football_api_team_id = sorted(worst_teams, key=lambda x: x[1], reverse=True).pop()[0]
-        else:
-            worst_team_football_api_team_id = worst_team_football_api_team_ids.pop()
-
-        # print(worst_team_football_api_team_ids)
-        # assert len(worst_team_football_api_team_ids) == 1
-        # worst_team_football_api_team_id = worst_team_football_api_team_ids.pop()
-
-        return SweepstakeCategory(
-            id=SweepstakeCategoryIDEnum.WORST_TEAM,
-            prize_money=5,
-            team=teams_results_map[worst_team_football_api_team_id]["team"],
-            user=await self.database_api.get_user_by_football_api_team_id(worst_team_football_api_team_id),
-            data=(
-                f"Lost {teams_results_map[worst_team_football_api_team_id]['losses']} games "
-                f"and conceded {teams_results_map[worst_team_football_api_team_id]['goals_conceded']} goals "
-                f"and only scored {teams_results_map[worst_team_football_api_team_id]['goals_scored']} goals"
-            ),
-        )
+        category = SweepstakeCategory(id=SweepstakeCategoryIDEnum.WORST_TEAM, prize_money=5)
+        if stats := await self.database_api.get_worst_team_stats():
+            category.team = stats.team
+            category.user = stats.user
+            category.data = (
+                f"Lost {stats.losses} games "
+                f"and conceded {stats.goals_conceded} goals "
+                f"and only scored {stats.goals_scored} goals"
+            )
+        return category
 
     async def get_filthiest_team(self) -> SweepstakeCategory:
-        teams_results_map = {
-            team.football_api_team_id: {
-                "team": team,
-                "yellows": 0,
-                "reds": 0,
-                "yellows_then_red": 0,
-                "total": 0,
-            }
-            for team in await self.database_api.get_teams()
-        }
-
-        for player in await self.database_api.get_players():
-            teams_results_map[player.football_api_team_id]["yellows"] += player.yellow_cards or 0
-            teams_results_map[player.football_api_team_id]["reds"] += player.red_cards or 0
-            teams_results_map[player.football_api_team_id]["yellows_then_red"] += player.yellow_then_red_cards or 0
-
-        for team, results_map in teams_results_map.items():
-            results_map["total"] = (
-                (results_map["yellows"] * 1) + (results_map["yellows_then_red"] * 2) + (results_map["reds"] * 3)
+        category = SweepstakeCategory(id=SweepstakeCategoryIDEnum.FILTHIEST_TEAM, prize_money=10)
+        if stats := await self.database_api.get_filthiest_team_stats():
+            category.team = stats.team
+            category.user = stats.user
+            category.data = (
+                f"Players given {stats.yellow_cards} yellow cards, "
+                f"{stats.yellow_then_red_cards} yellows then reds and {stats.red_cards} red cards"
             )
-
-        worst_team_map = sorted(list(teams_results_map.values()), key=lambda x: x["total"], reverse=True)[0]
-
-        return SweepstakeCategory(
-            id=SweepstakeCategoryIDEnum.FILTHIEST_TEAM,
-            prize_money=10,
-            team=worst_team_map["team"],
-            user=await self.database_api.get_user_by_football_api_team_id(worst_team_map["team"].football_api_team_id),
-            data=(
-                f"Players given {worst_team_map['yellows']} yellow cards, "
-                f"{worst_team_map['yellows_then_red']} yellows then reds and {worst_team_map['reds']} red cards"
-            ),
-        )
+        return category
 
     async def get_team_with_biggest_loss(self) -> SweepstakeCategory:
-        teams_results_map = {
-            team.football_api_team_id: {
-                "team": team,
-                "losses": [],
-            }
-            for team in await self.database_api.get_teams()
-        }
-
-        for fixture in await self.database_api.get_completed_fixtures():
-            if fixture.home_team_winner:
-                teams_results_map[fixture.away_team_football_api_team_id]["losses"].append(fixture)
-            if fixture.away_team_winner:
-                teams_results_map[fixture.home_team_football_api_team_id]["losses"].append(fixture)
-
-        worst_goal_difference = 0
-        best_goals_totals = 0
-        team_with_biggest_loss = None
-        fixture_with_biggest_loss = None
-        for team, results_map in teams_results_map.items():
-            for fixture in results_map["losses"]:
-                goal_difference = abs((fixture.home_team_goals or 0) - (fixture.away_team_goals or 0))
-                goals_total = (fixture.home_team_goals or 0) + (fixture.away_team_goals or 0)
-                if goal_difference >= worst_goal_difference and goals_total >= best_goals_totals:
-                    worst_goal_difference = goal_difference
-                    best_goals_totals = goals_total
-                    team_with_biggest_loss = results_map["team"]
-                    fixture_with_biggest_loss = fixture
-
-        winning_team_name = (
-            fixture_with_biggest_loss.home_team
-            if fixture_with_biggest_loss.home_team_winner
-            else fixture_with_biggest_loss.away_team
-        )
-        winning_team_goals = (
-            fixture_with_biggest_loss.home_team_goals
-            if fixture_with_biggest_loss.home_team_winner
-            else fixture_with_biggest_loss.away_team_goals
-        )
-        losing_team_name = (
-            fixture_with_biggest_loss.home_team
-            if fixture_with_biggest_loss.away_team_winner
-            else fixture_with_biggest_loss.away_team
-        )
-        losing_team_goals = (
-            fixture_with_biggest_loss.home_team_goals
-            if fixture_with_biggest_loss.away_team_winner
-            else fixture_with_biggest_loss.away_team_goals
-        )
-
-        return SweepstakeCategory(
-            id=SweepstakeCategoryIDEnum.TEAM_WITH_BIGGEST_LOSS,
-            prize_money=5,
-            team=team_with_biggest_loss,
-            user=await self.database_api.get_user_by_football_api_team_id(team_with_biggest_loss.football_api_team_id),
-            data=f"{winning_team_name} thrashed {losing_team_name} {winning_team_goals}-{losing_team_goals}",
-        )
+        category = SweepstakeCategory(id=SweepstakeCategoryIDEnum.TEAM_WITH_BIGGEST_LOSS, prize_money=5)
+        if fixture_context := await self.database_api.get_biggest_loss_fixture_context():
+            category.team = fixture_context.losing_or_away_team
+            category.user = fixture_context.losing_or_away_user
+            category.data = (
+                f"{fixture_context.winning_or_home_team.name} thrashed {fixture_context.losing_or_away_team.name} "
+                f"{fixture_context.winning_or_home_team_goals}-{fixture_context.losing_or_away_teams_goals}"
+            )
+        return category
 
     async def get_youngest_goal_scorer(self) -> SweepstakeCategory:
-        player = await self.database_api.get_youngest_goalscorer_player()
-        return SweepstakeCategory(
-            id=SweepstakeCategoryIDEnum.YOUNGEST_GOALSCORER,
-            prize_money=5,
-            team=await self.database_api.get_team_by_football_api_team_id(player.football_api_team_id),
-            user=await self.database_api.get_user_by_football_api_team_id(player.football_api_team_id),
-            data=f"{player.first_name} {player.last_name} born on {player.date_of_birth} is a goalscorer",
-        )
+        category = SweepstakeCategory(id=SweepstakeCategoryIDEnum.YOUNGEST_GOALSCORER, prize_money=5)
+        if player := await self.database_api.get_youngest_goalscorer_player():
+            category.team, category.user = await self.get_team_and_user(player.football_api_team_id)
+            category.data = f"{player.first_name} {player.last_name} born on {player.date_of_birth} is a goalscorer"
+        return category
 
     async def get_oldest_goal_scorer(self) -> SweepstakeCategory:
-        player = await self.database_api.get_oldest_goalscorer_player()
-        return SweepstakeCategory(
-            id=SweepstakeCategoryIDEnum.OLDEST_GOALSCORER,
-            prize_money=5,
-            team=await self.database_api.get_team_by_football_api_team_id(player.football_api_team_id),
-            user=await self.database_api.get_user_by_football_api_team_id(player.football_api_team_id),
-            data=f"{player.first_name} {player.last_name} born on {player.date_of_birth} is a goalscorer",
-        )
+        category = SweepstakeCategory(id=SweepstakeCategoryIDEnum.OLDEST_GOALSCORER, prize_money=5)
+        if player := await self.database_api.get_oldest_goalscorer_player():
+            category.team, category.user = await self.get_team_and_user(player.football_api_team_id)
+            category.data = f"{player.first_name} {player.last_name} born on {player.date_of_birth} is a goalscorer"
+        return category
 
     async def get_fixture_context(self, football_api_fixture_id: int) -> FixtureContext:
         logger.info(f"getting fixture context: {football_api_fixture_id=}...")
-        fixture = await self.database_api.get_fixture_by_football_api_fixture_id(football_api_fixture_id)
-        fixture_context = FixtureContext(
-            fixture=fixture,
-            home_user=await self.database_api.get_user_by_football_api_team_id(fixture.home_team_football_api_team_id),
-            away_user=await self.database_api.get_user_by_football_api_team_id(fixture.away_team_football_api_team_id),
-            home_team=await self.database_api.get_team_by_football_api_team_id(fixture.home_team_football_api_team_id),
-            away_team=await self.database_api.get_team_by_football_api_team_id(fixture.away_team_football_api_team_id),
+        (fixture_context,) = await self.database_api.get_fixture_contexts_by_football_api_fixture_ids(
+            [football_api_fixture_id]
         )
         return fixture_context
 
+    @cached_command("fixture", "team", "user", "draw")
     async def get_date_context(self, date: datetime.date) -> DateContext:
         logger.info(f"getting date context: {date=}...")
         date_context = DateContext(
             date=date,
-            fixture_contexts=[
-                await self.get_fixture_context(fixture.football_api_fixture_id)
-                for fixture in await self.database_api.get_fixtures_by_date(date)
-            ],
+            fixture_contexts=await self.database_api.get_fixture_contexts_by_date(date),
         )
         return date_context
 
-    async def get_user_context(self, telegram_api_user_id: int) -> UserContext:
-        logger.info(f"getting date context: {telegram_api_user_id=}...")
+    @cached_command("fixture", "team", "user", "draw")
+    async def get_user_context(
+        self,
+        telegram_api_user_id: int,
+        with_fixtures: bool = True,
+        fixture_statuses: list[FixtureStatusEnum] | None = None,
+    ) -> UserContext:
+        logger.info(f"getting user context: {telegram_api_user_id=} {with_fixtures=} {fixture_statuses=}...")
         user_context = UserContext(
             user=await self.database_api.get_user_by_telegram_api_user_id(telegram_api_user_id),
             teams=await self.database_api.get_teams_by_telegram_api_user_id(telegram_api_user_id),
-            fixture_contexts=[
-                await self.get_fixture_context(football_api_fixture_id)
-                for football_api_fixture_id in await self.database_api.get_football_api_fixture_ids_by_telegram_api_user_id(
-                    telegram_api_user_id
+            fixture_contexts=(
+                await self.database_api.get_fixture_contexts_by_telegram_api_user_id(
+                    telegram_api_user_id, statuses=fixture_statuses
                 )
-            ],
+                if with_fixtures
+                else []
+            ),
         )
         return user_context
 
@@ -383,4 +518,5 @@ class App:
         # self.telegram_api.run(self.setup_bot_commands())
         logger.info("running api")
         self.telegram_api.run()
+        self.telegram_api.loop.run_until_complete(self.on_shutdown())
         logger.info("finishing...")
@@ -16,8 +16,22 @@ class Config(BaseSettings):
     TELEGRAM_API_HASH: Annotated[str, Field()]
     TELEGRAM_CHAT_ID: Annotated[int, Field()]
     FOOTBALL_API_KEY: Annotated[str, Field()]
+    FOOTBALL_API_REQUESTS_PER_SECOND: Annotated[float, Field()] = 5
+    FOOTBALL_API_REQUESTS_PER_DAY: Annotated[int | None, Field()] = 7_500
+    FOOTBALL_API_CACHE_MODE: Annotated[str, Field()] = "read_write"
+    FOOTBALL_API_CACHE_DIR: Annotated[Path, Field()] = root / ".cache" / "football_api"
     POSTGRES_URL: Annotated[str, Field()]
+    DB_POOL_SIZE: Annotated[int, Field()] = 5
+    DB_MAX_OVERFLOW: Annotated[int, Field()] = 10
+    DB_POOL_TIMEOUT: Annotated[float, Field()] = 30
+    DB_POOL_RECYCLE: Annotated[int, Field()] = 1_800
+    DB_POOL_PRE_PING: Annotated[bool, Field()] = True
+    DB_PREPARED_STATEMENT_CACHE_SIZE: Annotated[int, Field()] = 500
     OPEN_WEATHER_MAP_API_KEY: Annotated[str, Field()]
+    HTTP2: Annotated[bool, Field()] = False
+    HTTP_MAX_CONNECTIONS_PER_HOST: Annotated[int, Field()] = 10
+    HTTP_KEEPALIVE_EXPIRY: Annotated[float, Field()] = 60
+    COMMAND_CACHE_TTL: Annotated[float, Field()] = 300
 
     @property
     def async_postgres_url(self) -> str:
@@ -0,0 +1,97 @@
+"""team stats view
+
+Revision ID: 3f7a9c15d2b8
+Revises: 9d4c2a61e8f7
+Create Date: 2026-10-17 11:26:08.412537
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7a9c15d2b8"
+down_revision: Union[str, None] = "9d4c2a61e8f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the statuses of FixtureStatusEnum.is_finished() as of this revision, changing them needs a new migration
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW team_stats AS
+        WITH sides AS (
+            SELECT
+                home_team_football_api_team_id AS football_api_team_id,
+                football_api_fixture_id,
+                home_team_goals AS goals_scored,
+                away_team_goals AS goals_conceded,
+                away_team_winner AS lost
+            FROM fixture
+            WHERE status IN ('FT', 'AET', 'PEN', 'AWD', 'WO')
+            UNION ALL
+            SELECT
+                away_team_football_api_team_id AS football_api_team_id,
+                football_api_fixture_id,
+                away_team_goals AS goals_scored,
+                home_team_goals AS goals_conceded,
+                home_team_winner AS lost
+            FROM fixture
+            WHERE status IN ('FT', 'AET', 'PEN', 'AWD', 'WO')
+        ),
+        results AS (
+            SELECT
+                football_api_team_id,
+                count(*) FILTER (WHERE lost) AS losses,
+                sum(goals_scored) AS goals_scored,
+                sum(goals_conceded) AS goals_conceded
+            FROM sides
+            GROUP BY football_api_team_id
+        ),
+        biggest_defeats AS (
+            SELECT DISTINCT ON (football_api_team_id)
+                football_api_team_id,
+                football_api_fixture_id AS biggest_defeat_football_api_fixture_id,
+                coalesce(goals_conceded, 0) - coalesce(goals_scored, 0) AS biggest_defeat_goal_difference,
+                coalesce(goals_conceded, 0) + coalesce(goals_scored, 0) AS biggest_defeat_goals_total
+            FROM sides
+            WHERE lost
+            ORDER BY football_api_team_id, biggest_defeat_goal_difference DESC, biggest_defeat_goals_total DESC
+        ),
+        cards AS (
+            SELECT
+                football_api_team_id,
+                sum(yellow_cards) AS yellow_cards,
+                sum(yellow_then_red_cards) AS yellow_then_red_cards,
+                sum(red_cards) AS red_cards
+            FROM player
+            GROUP BY football_api_team_id
+        )
+        SELECT
+            team.football_api_team_id,
+            coalesce(results.losses, 0) AS losses,
+            coalesce(results.goals_scored, 0) AS goals_scored,
+            coalesce(results.goals_conceded, 0) AS goals_conceded,
+            coalesce(cards.yellow_cards, 0) AS yellow_cards,
+            coalesce(cards.yellow_then_red_cards, 0) AS yellow_then_red_cards,
+            coalesce(cards.red_cards, 0) AS red_cards,
+            biggest_defeats.biggest_defeat_football_api_fixture_id,
+            biggest_defeats.biggest_defeat_goal_difference,
+            biggest_defeats.biggest_defeat_goals_total
+        FROM team
+        LEFT JOIN results ON results.football_api_team_id = team.football_api_team_id
+        LEFT JOIN cards ON cards.football_api_team_id = team.football_api_team_id
+        LEFT JOIN biggest_defeats ON biggest_defeats.football_api_team_id = team.football_api_team_id
+        WITH DATA
+        """
+    )
+    # REFRESH ... CONCURRENTLY needs a unique index covering every row
+    op.create_index(op.f("ix_team_stats_football_api_team_id"), "team_stats", ["football_api_team_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_team_stats_football_api_team_id"), table_name="team_stats")
+    op.execute("DROP MATERIALIZED VIEW team_stats")
@@ -1,49 +1,132 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
+import time
 from contextlib import asynccontextmanager
+from contextlib import suppress
+from contextvars import ContextVar
 from functools import lru_cache
+from typing import Annotated
+from typing import Any
 from typing import AsyncGenerator
 
+from loguru import logger
+from pydantic import BaseModel
+from pydantic import Field
 from pyrogram.types import User as PyrogramUser
 from sqlalchemy import and_
+from sqlalchemy import delete
 from sqlalchemy import func
+from sqlalchemy import literal_column
 from sqlalchemy import or_
 from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy import tuple_
 from sqlalchemy import update
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.elements import ColumnElement
 
+from src.adapters.football_api.models import GETFixturesEventResponse
 from src.adapters.football_api.models import GETFixturesResponse
 from src.adapters.football_api.models import GETPlayerResponse
 from src.adapters.football_api.models import GETTeamInformationResponse
 from src.config import get_config
+from src.shared.db.cache import ReferenceData
+from src.shared.db.cache import get_reference_data_cache
 from src.shared.models import Fixture
+from src.shared.models import FixtureContext
 from src.shared.models import FixtureStatusEnum
+from src.shared.models import IngestResult
 from src.shared.models import Player
+from src.shared.models import SweepstakeCategoryIDEnum
+from src.shared.models import SweepstakeStanding
 from src.shared.models import Team
+from src.shared.models import TeamStats
 from src.shared.models import User
+from src.shared.tables import BaseTable
 from src.shared.tables import DrawTable
+from src.shared.tables import FixtureEventTable
 from src.shared.tables import FixtureTable
 from src.shared.tables import PlayerTable
+from src.shared.tables import SweepstakeStandingTable
+from src.shared.tables import TeamStatsView
 from src.shared.tables import TeamTable
 from src.shared.tables import UserTable
+from src.shared.utils.time import get_utc_now
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    return create_async_engine(
+        get_config().async_postgres_url,
+        pool_size=get_config().DB_POOL_SIZE,
+        max_overflow=get_config().DB_MAX_OVERFLOW,
+        pool_timeout=get_config().DB_POOL_TIMEOUT,
+        pool_recycle=get_config().DB_POOL_RECYCLE,
+        pool_pre_ping=get_config().DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": get_config().DB_PREPARED_STATEMENT_CACHE_SIZE},
+    )
 
 
 @lru_cache
 def get_session_factory() -> sessionmaker:
-    engine = create_async_engine(get_config().async_postgres_url)
-    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+
+
+class PoolMetrics(BaseModel):
+    checkouts: Annotated[int, Field()] = 0
+    total_wait: Annotated[float, Field()] = 0
+    max_wait: Annotated[float, Field()] = 0
+    size: Annotated[int, Field()] = 0
+    checked_out: Annotated[int, Field()] = 0
+    overflow: Annotated[int, Field()] = 0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.checkouts if self.checkouts else 0
+
+    @property
+    def utilisation(self) -> float:
+        capacity = self.size + get_config().DB_MAX_OVERFLOW
+        return self.checked_out / capacity if capacity else 0
+
+
+_pool_metrics = PoolMetrics()
+
+
+def get_pool_metrics() -> PoolMetrics:
+    pool = get_engine().pool
+    return _pool_metrics.model_copy(
+        update={"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+    )
+
+
+# set while a unit of work is open, so that every DatabaseAPI call inside it shares one connection and transaction
+_unit_of_work_session: ContextVar[AsyncSession | None] = ContextVar("unit_of_work_session", default=None)
 
 
 @asynccontextmanager
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_session(execution_options: dict[str, Any] | None = None) -> AsyncGenerator[AsyncSession, None]:
+    if (session := _unit_of_work_session.get()) is not None:
+        yield session
+        return
+
     session_factory = get_session_factory()
     async with session_factory() as session:
+        # checking the connection out up front is what lets the wait for the pool be measured
+        start = time.perf_counter()
+        await session.connection(execution_options=execution_options)
+        wait = time.perf_counter() - start
+        _pool_metrics.checkouts += 1
+        _pool_metrics.total_wait += wait
+        _pool_metrics.max_wait = max(_pool_metrics.max_wait, wait)
         try:
             yield session
         except SQLAlchemyError as e:
@@ -54,6 +137,29 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+@asynccontextmanager
+async def unit_of_work(read_only: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    # an AsyncSession is not safe for concurrent use, so DatabaseAPI calls inside must be awaited one at a time
+    if (session := _unit_of_work_session.get()) is not None:
+        yield session
+        return
+
+    execution_options = {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True} if read_only else None
+    async with get_session(execution_options) as session:
+        token = _unit_of_work_session.set(session)
+        try:
+            yield session
+            await session.commit()
+        finally:
+            _unit_of_work_session.reset(token)
+
+
+async def commit(session: AsyncSession) -> None:
+    # inside a unit of work the commit is left to the unit of work
+    if _unit_of_work_session.get() is not session:
+        await session.commit()
+
+
 @lru_cache
 def get_database_api() -> DatabaseAPI:
     return DatabaseAPI()
@@ -65,127 +171,309 @@ class EntryNotSaved(Exception): ...
 class EntryNotFound(Exception): ...
 
 
+# asyncpg caps a statement at 32767 bind parameters, the widest table has ~25 columns
+UPSERT_CHUNK_SIZE = 1_000
+
+
+async def upsert(
+    session: AsyncSession,
+    table: type[BaseTable],
+    entries: list[BaseTable],
+    update_columns: list[str],
+) -> IngestResult:
+    columns = table.__table__.c
+    primary_key = [column.name for column in table.__table__.primary_key]
+    # postgres refuses to update the same row twice in one statement, so the last duplicate wins
+    values_by_key = {tuple(v[c] for c in primary_key): v for v in (entry.to_dict() for entry in entries)}
+
+    unchanged = 0
+    if "fingerprint" in columns:
+        key_column = tuple_(*[columns[c] for c in primary_key]) if len(primary_key) > 1 else columns[primary_key[0]]
+        keys = list(values_by_key)
+        for i in range(0, len(keys), UPSERT_CHUNK_SIZE):
+            chunk = keys[i : i + UPSERT_CHUNK_SIZE]
+            query = select(*[columns[c] for c in primary_key], columns.fingerprint).where(
+                key_column.in_(chunk if len(primary_key) > 1 else [key for key, in chunk])
+            )
+            for *key, fingerprint in await session.execute(query):
+                if values_by_key[tuple(key)]["fingerprint"] == fingerprint:
+                    del values_by_key[tuple(key)]
+                    unchanged += 1
+
+    values = list(values_by_key.values())
+    written = []
+    for i in range(0, len(values), UPSERT_CHUNK_SIZE):
+        query = insert(table).values(values[i : i + UPSERT_CHUNK_SIZE])
+        if update_columns:
+            query = query.on_conflict_do_update(
+                index_elements=primary_key,
+                set_={column: query.excluded[column] for column in update_columns},
+                where=(
+                    columns.fingerprint.is_distinct_from(query.excluded.fingerprint)
+                    if "fingerprint" in columns
+                    else None
+                ),
+            )
+        else:
+            query = query.on_conflict_do_nothing(index_elements=primary_key)
+        written.extend((await session.execute(query.returning(literal_column("xmax = 0")))).scalars())
+
+    return IngestResult(
+        inserted=sum(written),
+        updated=len(written) - sum(written),
+        unchanged=unchanged + len(values) - len(written),
+    )
+
+
+def played_by(telegram_api_user_id: int) -> ColumnElement[bool]:
+    # home or away, each side checked against the user's teams so that either can use its own index
+    football_api_team_ids = select(DrawTable.football_api_team_id).where(
+        DrawTable.telegram_api_user_id == telegram_api_user_id
+    )
+    return or_(
+        FixtureTable.home_team_football_api_team_id.in_(football_api_team_ids),
+        FixtureTable.away_team_football_api_team_id.in_(football_api_team_ids),
+    )
+
+
+def kicks_off_on(date: datetime.date) -> ColumnElement[bool]:
+    # a range rather than DATE(kick_off), which would hide kick_off from its index
+    start = datetime.datetime.combine(date, datetime.time.min, tzinfo=datetime.timezone.utc)
+    return and_(FixtureTable.kick_off >= start, FixtureTable.kick_off < start + datetime.timedelta(days=1))
+
+
+TEAM_STATS_COLUMNS = [
+    "losses",
+    "goals_scored",
+    "goals_conceded",
+    "yellow_cards",
+    "yellow_then_red_cards",
+    "red_cards",
+]
+
+
 class DatabaseAPI:
+    @staticmethod
+    async def warm_up() -> None:
+        # fills the pool and has every connection prepare the statements the commands use the most
+        async def warm_up_connection() -> None:
+            async with unit_of_work(read_only=True):
+                await DatabaseAPI.get_fixture_contexts_by_date(get_utc_now().date())
+                await DatabaseAPI.get_sweepstake_standings()
+                await DatabaseAPI.get_worst_team_stats()
+                await DatabaseAPI.get_filthiest_team_stats()
+                await DatabaseAPI.get_biggest_loss_fixture_context()
+                await DatabaseAPI.get_in_progress_fixtures()
+                await DatabaseAPI.get_next_kick_off(get_utc_now())
+                await DatabaseAPI.get_football_api_fixture_ids_by_telegram_api_user_id(0)
+                with suppress(AttributeError):
+                    await DatabaseAPI.get_fixture_by_football_api_fixture_id(0)
+
+        start = time.perf_counter()
+        await DatabaseAPI.get_reference_data()
+        await asyncio.gather(*[warm_up_connection() for _ in range(get_config().DB_POOL_SIZE)])
+        logger.info(f"database pool warmed up in {time.perf_counter() - start:.2f}s: {get_pool_metrics()}")
+
+    @staticmethod
+    async def get_reference_data() -> ReferenceData:
+        return await get_reference_data_cache().get(DatabaseAPI.load_reference_data)
+
+    @staticmethod
+    async def load_reference_data() -> ReferenceData:
+        async with get_session() as session:
+            teams = [entry.to_model() for entry in (await session.execute(select(TeamTable))).scalars()]
+            users = [entry.to_model() for entry in (await session.execute(select(UserTable))).scalars()]
+            draws = [entry.to_model() for entry in (await session.execute(select(DrawTable))).scalars()]
+        return ReferenceData.from_entries(teams, users, draws)
+
     @staticmethod
     async def add_user_from_pyrogram_user(user: PyrogramUser) -> None:
+        await DatabaseAPI.add_users_from_pyrogram_users([user])
+
+    @staticmethod
+    async def add_users_from_pyrogram_users(users: list[PyrogramUser]) -> IngestResult:
         async with get_session() as session:
-            try:
-                session.add(UserTable.from_pyrogram_user(user))
-                await session.commit()
-            except IntegrityError:
-                await session.flush()
-                await session.rollback()
-                query = (
-                    update(UserTable)
-                    .where(UserTable.telegram_api_user_id == user.id)
-                    .values(first_name=user.first_name, last_name=user.last_name, username=user.username)
-                )
-                await session.execute(query)
-                await session.commit()
+            result = await upsert(
+                session,
+                UserTable,
+                [UserTable.from_pyrogram_user(user) for user in users],
+                update_columns=["first_name", "last_name", "username"],
+            )
+            await commit(session)
+        if result.changed:
+            get_reference_data_cache().invalidate()
+        return result
 
     @staticmethod
     async def add_team_from_football_api_team_response(response: GETTeamInformationResponse) -> None:
+        await DatabaseAPI.add_teams_from_football_api_team_responses([response])
+
+    @staticmethod
+    async def add_teams_from_football_api_team_responses(responses: list[GETTeamInformationResponse]) -> IngestResult:
         async with get_session() as session:
-            try:
-                session.add(TeamTable.from_football_api_team_response(response))
-                await session.commit()
-            except IntegrityError:
-                pass
+            result = await upsert(
+                session,
+                TeamTable,
+                [TeamTable.from_football_api_team_response(response) for response in responses],
+                update_columns=[],
+            )
+            await commit(session)
+        if result.changed:
+            get_reference_data_cache().invalidate()
+        return result
 
     @staticmethod
     async def add_draw(telegram_api_user_id: int, football_api_team_id: int) -> None:
+        await DatabaseAPI.add_draws({telegram_api_user_id: [football_api_team_id]})
+
+    @staticmethod
+    async def add_draws(telegram_api_user_id_to_football_api_team_ids: dict[int, list[int]]) -> IngestResult:
+        draws = [
+            DrawTable(telegram_api_user_id=telegram_api_user_id, football_api_team_id=football_api_team_id)
+            for telegram_api_user_id, football_api_team_ids in telegram_api_user_id_to_football_api_team_ids.items()
+            for football_api_team_id in football_api_team_ids
+        ]
         async with get_session() as session:
-            try:
-                session.add(
-                    DrawTable(telegram_api_user_id=telegram_api_user_id, football_api_team_id=football_api_team_id)
-                )
-                await session.commit()
-            except IntegrityError:
-                pass
+            result = await upsert(session, DrawTable, draws, update_columns=[])
+            await commit(session)
+        if result.changed:
+            get_reference_data_cache().invalidate()
+        return result
 
     @staticmethod
     async def add_fixture_from_football_api_fixture_response(response: GETFixturesResponse) -> None:
+        await DatabaseAPI.add_fixtures_from_football_api_fixture_responses([response])
+
+    @staticmethod
+    async def add_fixtures_from_football_api_fixture_responses(responses: list[GETFixturesResponse]) -> IngestResult:
+        async with get_session() as session:
+            result = await upsert(
+                session,
+                FixtureTable,
+                [FixtureTable.from_football_api_fixture_response(response) for response in responses],
+                update_columns=[
+                    column.name
+                    for column in FixtureTable.__table__.columns
+                    if not column.primary_key and column.name != "events_fingerprint"
+                ],
+            )
+            await commit(session)
+        return result
+
+    @staticmethod
+    async def add_player_from_football_api_player_response(response: GETPlayerResponse) -> None:
+        await DatabaseAPI.add_players_from_football_api_player_responses([response])
+
+    @staticmethod
+    async def add_players_from_football_api_player_responses(responses: list[GETPlayerResponse]) -> IngestResult:
         async with get_session() as session:
-            try:
-                session.add(FixtureTable.from_football_api_fixture_response(response))
-                await session.commit()
-            except IntegrityError:
-                await session.flush()
-                await session.rollback()
+            result = await upsert(
+                session,
+                PlayerTable,
+                [PlayerTable.from_football_api_player_response(response) for response in responses],
+                update_columns=[column.name for column in PlayerTable.__table__.columns if not column.primary_key],
+            )
+            await commit(session)
+        return result
+
+    @staticmethod
+    async def load_players_from_football_api_player_responses(responses: list[GETPlayerResponse]) -> IngestResult:
+        players = {
+            player.football_api_player_id: player
+            for player in (PlayerTable.from_football_api_player_response(response) for response in responses)
+        }
+        columns = [column.name for column in PlayerTable.__table__.columns]
+        update_columns = [column.name for column in PlayerTable.__table__.columns if not column.primary_key]
+        async with get_session() as session:
+            # created through the session so that it lives inside the same transaction as the COPY
+            query = text(
+                "CREATE TEMPORARY TABLE IF NOT EXISTS player_staging (LIKE player INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            await session.execute(query)
+            await session.execute(text("TRUNCATE player_staging"))
+            connection = await (await session.connection()).get_raw_connection()
+            await connection.driver_connection.copy_records_to_table(
+                "player_staging",
+                records=[tuple(player.to_dict().values()) for player in players.values()],
+                columns=columns,
+            )
+            query = text(
+                f"INSERT INTO player ({', '.join(columns)}) "
+                f"SELECT {', '.join(columns)} FROM player_staging "
+                "ON CONFLICT (football_api_player_id) DO UPDATE "
+                f"SET {', '.join(f'{column} = EXCLUDED.{column}' for column in update_columns)} "
+                "WHERE player.fingerprint IS DISTINCT FROM EXCLUDED.fingerprint "
+                "RETURNING xmax = 0 AS inserted"
+            )
+            written = [inserted for inserted in (await session.execute(query)).scalars()]
+            await commit(session)
+        return IngestResult(
+            inserted=sum(written),
+            updated=len(written) - sum(written),
+            unchanged=len(players) - len(written),
+        )
+
+    @staticmethod
+    async def add_fixture_events_from_football_api_fixture_event_responses(
+        fixtures_to_responses: list[tuple[Fixture, list[GETFixturesEventResponse]]],
+    ) -> IngestResult:
+        events = [
+            FixtureEventTable.from_football_api_fixture_event_response(fixture.football_api_fixture_id, i, response)
+            for fixture, responses in fixtures_to_responses
+            for i, response in enumerate(responses)
+        ]
+        async with get_session() as session:
+            # the api gives events no ids, so a fixture's events are replaced wholesale
+            query = delete(FixtureEventTable).where(
+                FixtureEventTable.football_api_fixture_id.in_(
+                    [fixture.football_api_fixture_id for fixture, _ in fixtures_to_responses]
+                )
+            )
+            await session.execute(query)
+            result = await upsert(session, FixtureEventTable, events, update_columns=[])
+            for fixture, _ in fixtures_to_responses:
                 query = (
                     update(FixtureTable)
-                    .where(FixtureTable.football_api_fixture_id == response["fixture"]["id"])
-                    .values(
-                        status=response["fixture"]["status"]["short"],
-                        home_team_goals=response["goals"]["home"],
-                        away_team_goals=response["goals"]["away"],
-                        home_team_winner=response["teams"]["home"]["winner"],
-                        away_team_winner=response["teams"]["away"]["winner"],
-                        kick_off=datetime.datetime.fromisoformat(response["fixture"]["date"]),
-                        venue_city=response["fixture"]["venue"]["city"],
-                        venue_name=response["fixture"]["venue"]["name"],
-                        round=response["league"]["round"],
-                        home_goals_half_time=response["score"]["halftime"]["home"],
-                        away_goals_half_time=response["score"]["halftime"]["away"],
-                        home_goals_full_time=response["score"]["fulltime"]["home"],
-                        away_goals_full_time=response["score"]["fulltime"]["away"],
-                        away_goals_extra_time=response["score"]["extratime"]["away"],
-                        home_goals_extra_time=response["score"]["extratime"]["home"],
-                        home_goals_penalties=response["score"]["penalty"]["home"],
-                        away_goals_penalties=response["score"]["penalty"]["away"],
-                    )
+                    .where(FixtureTable.football_api_fixture_id == fixture.football_api_fixture_id)
+                    .values(events_fingerprint=fixture.fingerprint)
                 )
                 await session.execute(query)
-                await session.commit()
+            await commit(session)
+        return result
 
     @staticmethod
-    async def add_player_from_football_api_player_response(response: GETPlayerResponse) -> None:
+    async def get_fixtures_with_stale_events(limit: int | None = None) -> list[Fixture]:
         async with get_session() as session:
-            try:
-                session.add(PlayerTable.from_football_api_player_response(response))
-                await session.commit()
-            except IntegrityError:
-                await session.flush()
-                await session.rollback()
-                query = (
-                    update(PlayerTable)
-                    .where(PlayerTable.football_api_player_id == response["player"]["id"])
-                    .values(
-                        yellow_cards=response["statistics"][0]["cards"]["yellow"],
-                        yellow_then_red_cards=response["statistics"][0]["cards"]["yellowred"],
-                        red_cards=response["statistics"][0]["cards"]["red"],
-                        goals=response["statistics"][0]["goals"]["total"],
+            query = (
+                select(FixtureTable)
+                .where(
+                    and_(
+                        FixtureTable.status.not_in(FixtureStatusEnum.not_started()),
+                        FixtureTable.events_fingerprint.is_distinct_from(FixtureTable.fingerprint),
                     )
                 )
-                await session.execute(query)
-                await session.commit()
+                .order_by(FixtureTable.kick_off)
+                .limit(limit)
+            )
+            return [entry.to_model() for entry in (await session.execute(query)).scalars()]
 
     @staticmethod
     async def get_user_by_telegram_api_user_id(telegram_api_user_id: int) -> User:
-        async with get_session() as session:
-            query = select(UserTable).where(UserTable.telegram_api_user_id == telegram_api_user_id)
-            return (await session.execute(query)).scalar().to_model()
+        try:
+            return (await DatabaseAPI.get_reference_data()).users_by_telegram_api_user_id[telegram_api_user_id]
+        except KeyError:
+            raise EntryNotFound(f"{telegram_api_user_id} not found")
 
     @staticmethod
     async def get_user_by_football_api_team_id(football_api_team_id: int) -> User:
-        async with get_session() as session:
-            query = (
-                select(UserTable)
-                .join(DrawTable, DrawTable.telegram_api_user_id == UserTable.telegram_api_user_id)
-                .where(DrawTable.football_api_team_id == football_api_team_id)
-            )
-            return (await session.execute(query)).scalar().to_model()
+        try:
+            return (await DatabaseAPI.get_reference_data()).users_by_football_api_team_id[football_api_team_id]
+        except KeyError:
+            raise EntryNotFound(f"{football_api_team_id} not found")
 
     @staticmethod
     async def get_teams_by_telegram_api_user_id(telegram_api_user_id: int) -> list[Team]:
-        async with get_session() as session:
-            query = (
-                select(TeamTable)
-                .join(DrawTable, DrawTable.football_api_team_id == TeamTable.football_api_team_id)
-                .where(DrawTable.telegram_api_user_id == telegram_api_user_id)
-                .order_by(TeamTable.name)
-            )
-            return [entry.to_model() for entry in (await session.execute(query)).scalars()]
+        return (await DatabaseAPI.get_reference_data()).teams_by_telegram_api_user_id.get(telegram_api_user_id, [])
 
     @staticmethod
     async def get_fixture_by_football_api_fixture_id(football_api_fixture_id: int) -> Fixture:
@@ -195,35 +483,175 @@ class DatabaseAPI:
 
     @staticmethod
     async def get_team_by_football_api_team_id(football_api_team_id: int) -> Team:
-        async with get_session() as session:
-            query = select(TeamTable).where(TeamTable.football_api_team_id == football_api_team_id)
-            return (await session.execute(query)).scalar().to_model()
+        try:
+            return (await DatabaseAPI.get_reference_data()).teams_by_football_api_team_id[football_api_team_id]
+        except KeyError:
+            raise EntryNotFound(f"{football_api_team_id} not found")
 
     @staticmethod
     async def get_football_api_fixture_ids_by_telegram_api_user_id(telegram_api_user_id: int) -> list[int]:
-        draw1 = aliased(DrawTable)
-        draw2 = aliased(DrawTable)
         async with get_session() as session:
             query = (
                 select(FixtureTable.football_api_fixture_id)
-                .join(draw1, draw1.football_api_team_id == FixtureTable.home_team_football_api_team_id)
-                .join(draw2, draw2.football_api_team_id == FixtureTable.away_team_football_api_team_id)
-                .where(
-                    or_(
-                        draw1.telegram_api_user_id == telegram_api_user_id,
-                        draw2.football_api_team_id == telegram_api_user_id,
-                    )
-                )
+                .where(played_by(telegram_api_user_id))
+                .order_by(FixtureTable.kick_off)
             )
             return [entry for entry in (await session.execute(query)).scalars()]
 
     @staticmethod
     async def get_fixtures_by_date(date: datetime.date) -> list[Fixture]:
         async with get_session() as session:
+            query = select(FixtureTable).where(kicks_off_on(date)).order_by(FixtureTable.kick_off)
+            return [entry.to_model() for entry in (await session.execute(query)).scalars()]
+
+    @staticmethod
+    async def get_fixture_contexts(
+        *criteria: ColumnElement[bool],
+        order_by: list[ColumnElement] | None = None,
+        limit: int | None = None,
+    ) -> list[FixtureContext]:
+        home_team = aliased(TeamTable)
+        away_team = aliased(TeamTable)
+        home_draw = aliased(DrawTable)
+        away_draw = aliased(DrawTable)
+        home_user = aliased(UserTable)
+        away_user = aliased(UserTable)
+        async with get_session() as session:
+            # outer, so that a team nobody has drawn yet still gets its fixtures shown
             query = (
-                select(FixtureTable).where(func.DATE(FixtureTable.kick_off) == date).order_by(FixtureTable.kick_off)
+                select(FixtureTable, home_team, away_team, home_user, away_user)
+                .join(home_team, home_team.football_api_team_id == FixtureTable.home_team_football_api_team_id)
+                .join(away_team, away_team.football_api_team_id == FixtureTable.away_team_football_api_team_id)
+                .outerjoin(home_draw, home_draw.football_api_team_id == FixtureTable.home_team_football_api_team_id)
+                .outerjoin(away_draw, away_draw.football_api_team_id == FixtureTable.away_team_football_api_team_id)
+                .outerjoin(home_user, home_user.telegram_api_user_id == home_draw.telegram_api_user_id)
+                .outerjoin(away_user, away_user.telegram_api_user_id == away_draw.telegram_api_user_id)
+                .where(*criteria)
+                .order_by(*(order_by or [FixtureTable.kick_off]))
+                .limit(limit)
             )
-            return [entry.to_model() for entry in (await session.execute(query)).scalars()]
+            return [
+                FixtureContext(
+                    fixture=fixture.to_model(),
+                    home_team=home_team.to_model(),
+                    away_team=away_team.to_model(),
+                    home_user=home_user.to_model() if home_user else None,
+                    away_user=away_user.to_model() if away_user else None,
+                )
+                for fixture, home_team, away_team, home_user, away_user in await session.execute(query)
+            ]
+
+    @staticmethod
+    async def get_fixture_contexts_by_date(date: datetime.date) -> list[FixtureContext]:
+        return await DatabaseAPI.get_fixture_contexts(kicks_off_on(date))
+
+    @staticmethod
+    async def get_fixture_contexts_by_football_api_fixture_ids(
+        football_api_fixture_ids: list[int],
+    ) -> list[FixtureContext]:
+        return await DatabaseAPI.get_fixture_contexts(
+            FixtureTable.football_api_fixture_id.in_(football_api_fixture_ids)
+        )
+
+    @staticmethod
+    async def get_fixture_contexts_by_telegram_api_user_id(
+        telegram_api_user_id: int,
+        statuses: list[FixtureStatusEnum] | None = None,
+    ) -> list[FixtureContext]:
+        criteria = [played_by(telegram_api_user_id)]
+        if statuses is not None:
+            criteria.append(FixtureTable.status.in_(statuses))
+        return await DatabaseAPI.get_fixture_contexts(*criteria)
+
+    @staticmethod
+    async def get_biggest_loss_fixture_context() -> FixtureContext | None:
+        biggest_defeat = (
+            select(TeamStatsView.biggest_defeat_football_api_fixture_id)
+            .where(TeamStatsView.biggest_defeat_football_api_fixture_id.isnot(None))
+            .order_by(
+                TeamStatsView.biggest_defeat_goal_difference.desc(),
+                TeamStatsView.biggest_defeat_goals_total.desc(),
+            )
+            .limit(1)
+            .scalar_subquery()
+        )
+        fixture_contexts = await DatabaseAPI.get_fixture_contexts(
+            FixtureTable.football_api_fixture_id == biggest_defeat
+        )
+        return fixture_contexts[0] if fixture_contexts else None
+
+    @staticmethod
+    async def refresh_team_stats() -> None:
+        async with get_session() as session:
+            # concurrently, so that /categories keeps reading the previous stats while they are rebuilt
+            await session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY team_stats"))
+            await commit(session)
+
+    @staticmethod
+    async def set_sweepstake_standings(
+        standings: list[SweepstakeStanding],
+    ) -> dict[SweepstakeCategoryIDEnum, int | None]:
+        entries = [SweepstakeStandingTable.from_sweepstake_standing(standing) for standing in standings]
+        async with get_session() as session:
+            # locked, so that two concurrent ingests can't both report the same change of hands
+            query = (
+                select(SweepstakeStandingTable.id, SweepstakeStandingTable.football_api_team_id)
+                .where(SweepstakeStandingTable.id.in_([entry.id for entry in entries]))
+                .with_for_update()
+            )
+            previous_football_api_team_ids = dict((await session.execute(query)).tuples().all())
+            await upsert(
+                session,
+                SweepstakeStandingTable,
+                entries,
+                update_columns=[c.name for c in SweepstakeStandingTable.__table__.columns if not c.primary_key],
+            )
+            await commit(session)
+        # the previous holder of every category that changed hands, categories seen for the first time are not news
+        return {
+            SweepstakeCategoryIDEnum(entry.id): previous_football_api_team_ids[entry.id]
+            for entry in entries
+            if entry.id in previous_football_api_team_ids
+            and previous_football_api_team_ids[entry.id] != entry.football_api_team_id
+        }
+
+    @staticmethod
+    async def get_sweepstake_standings() -> list[SweepstakeStanding]:
+        async with get_session() as session:
+            query = select(SweepstakeStandingTable)
+            return [standing.to_model() for standing in (await session.execute(query)).scalars()]
+
+    @staticmethod
+    async def get_team_stats(*order_by: ColumnElement) -> TeamStats | None:
+        async with get_session() as session:
+            query = (
+                select(TeamTable, UserTable, *[getattr(TeamStatsView, column) for column in TEAM_STATS_COLUMNS])
+                .join(TeamStatsView, TeamStatsView.football_api_team_id == TeamTable.football_api_team_id)
+                .join(DrawTable, DrawTable.football_api_team_id == TeamTable.football_api_team_id)
+                .join(UserTable, UserTable.telegram_api_user_id == DrawTable.telegram_api_user_id)
+                .order_by(*order_by)
+                .limit(1)
+            )
+            if (row := (await session.execute(query)).first()) is None:
+                return None
+            team, user, *values = row
+            return TeamStats(team=team.to_model(), user=user.to_model(), **dict(zip(TEAM_STATS_COLUMNS, values)))
+
+    @staticmethod
+    async def get_worst_team_stats() -> TeamStats | None:
+        return await DatabaseAPI.get_team_stats(
+            TeamStatsView.losses.desc(),
+            TeamStatsView.goals_conceded.desc(),
+            TeamStatsView.goals_scored,
+        )
+
+    @staticmethod
+    async def get_filthiest_team_stats() -> TeamStats | None:
+        return await DatabaseAPI.get_team_stats(
+            (
+                TeamStatsView.yellow_cards + 2 * TeamStatsView.yellow_then_red_cards + 3 * TeamStatsView.red_cards
+            ).desc(),
+        )
 
     @staticmethod
     async def get_completed_fixtures() -> list[Fixture]:
@@ -236,11 +664,27 @@ class DatabaseAPI:
             return [entry.to_model() for entry in (await session.execute(query)).scalars()]
 
     @staticmethod
-    async def get_teams() -> list[Team]:
+    async def get_in_progress_fixtures() -> list[Fixture]:
         async with get_session() as session:
-            query = select(TeamTable).order_by(TeamTable.name)
+            query = (
+                select(FixtureTable)
+                .where(FixtureTable.status.in_(FixtureStatusEnum.in_progress()))
+                .order_by(FixtureTable.kick_off)
+            )
             return [entry.to_model() for entry in (await session.execute(query)).scalars()]
 
+    @staticmethod
+    async def get_next_kick_off(after: datetime.datetime) -> datetime.datetime | None:
+        async with get_session() as session:
+            query = select(func.min(FixtureTable.kick_off)).where(
+                FixtureTable.status.in_(FixtureStatusEnum.not_started()), FixtureTable.kick_off >= after
+            )
+            return (await session.execute(query)).scalar()
+
+    @staticmethod
+    async def get_teams() -> list[Team]:
+        return sorted((await DatabaseAPI.get_reference_data()).teams_by_name.values(), key=lambda team: team.name)
+
     @staticmethod
     async def get_players() -> list[Player]:
         async with get_session() as session:
@@ -248,7 +692,7 @@ class DatabaseAPI:
             return [entry.to_model() for entry in (await session.execute(query)).scalars()]
 
     @staticmethod
-    async def get_youngest_goalscorer_player() -> Player:
+    async def get_youngest_goalscorer_player() -> Player | None:
         async with get_session() as session:
             query = (
                 select(PlayerTable)
@@ -261,10 +705,11 @@ class DatabaseAPI:
                 .order_by(PlayerTable.date_of_birth.desc())
                 .limit(1)
             )
-            return (await session.execute(query)).scalar().to_model()
+            player = (await session.execute(query)).scalar()
+            return player.to_model() if player else None
 
     @staticmethod
-    async def get_oldest_goalscorer_player() -> Player:
+    async def get_oldest_goalscorer_player() -> Player | None:
         async with get_session() as session:
             query = (
                 select(PlayerTable)
@@ -277,27 +722,21 @@ class DatabaseAPI:
                 .order_by(PlayerTable.date_of_birth)
                 .limit(1)
             )
-            return (await session.execute(query)).scalar().to_model()
+            player = (await session.execute(query)).scalar()
+            return player.to_model() if player else None
 
     @staticmethod
     async def get_user_by_team_name(name: str) -> User:
-        async with get_session() as session:
-            query = (
-                select(UserTable)
-                .join(DrawTable, DrawTable.telegram_api_user_id == UserTable.telegram_api_user_id)
-                .join(TeamTable, DrawTable.football_api_team_id == TeamTable.football_api_team_id)
-                .where(TeamTable.name == name)
-            )
-            try:
-                return (await session.execute(query)).scalar().to_model()
-            except AttributeError:
-                raise EntryNotFound(f"{name} not found")
+        reference_data = await DatabaseAPI.get_reference_data()
+        try:
+            team = reference_data.teams_by_name[name]
+            return reference_data.users_by_football_api_team_id[team.football_api_team_id]
+        except KeyError:
+            raise EntryNotFound(f"{name} not found")
 
     @staticmethod
     async def get_team_by_name(name: str) -> Team:
-        async with get_session() as session:
-            query = select(TeamTable).where(TeamTable.name == name)
-            try:
-                return (await session.execute(query)).scalar().to_model()
-            except AttributeError:
-                raise EntryNotFound(f"{name} not found")
+        try:
+            return (await DatabaseAPI.get_reference_data()).teams_by_name[name]
+        except KeyError:
+            raise EntryNotFound(f"{name} not found")
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+from functools import lru_cache
+from typing import Awaitable
+from typing import Callable
+
+from pydantic import BaseModel
+
+from src.shared.models import Draw
+from src.shared.models import Team
+from src.shared.models import User
+
+
+@lru_cache
+def get_reference_data_cache() -> ReferenceDataCache:
+    return ReferenceDataCache()
+
+
+class ReferenceData(BaseModel):
+    teams_by_football_api_team_id: dict[int, Team]
+    teams_by_name: dict[str, Team]
+    users_by_telegram_api_user_id: dict[int, User]
+    users_by_football_api_team_id: dict[int, User]
+    teams_by_telegram_api_user_id: dict[int, list[Team]]
+
+    @classmethod
+    def from_entries(cls, teams: list[Team], users: list[User], draws: list[Draw]) -> ReferenceData:
+        teams_by_football_api_team_id = {team.football_api_team_id: team for team in teams}
+        users_by_telegram_api_user_id = {user.telegram_api_user_id: user for user in users}
+        teams_by_telegram_api_user_id = {}
+        for draw in draws:
+            teams_by_telegram_api_user_id.setdefault(draw.telegram_api_user_id, []).append(
+                teams_by_football_api_team_id[draw.football_api_team_id]
+            )
+        return cls(
+            teams_by_football_api_team_id=teams_by_football_api_team_id,
+            teams_by_name={team.name: team for team in teams},
+            users_by_telegram_api_user_id=users_by_telegram_api_user_id,
+            users_by_football_api_team_id={
+                draw.football_api_team_id: users_by_telegram_api_user_id[draw.telegram_api_user_id] for draw in draws
+            },
+            teams_by_telegram_api_user_id={
+                telegram_api_user_id: sorted(teams, key=lambda team: team.name)
+                for telegram_api_user_id, teams in teams_by_telegram_api_user_id.items()
+            },
+        )
+
+
+class ReferenceDataCache:
+    def __init__(self) -> None:
+        self._reference_data: ReferenceData | None = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._reference_data = None
+        self._version += 1
+
+    async def get(self, load: Callable[[], Awaitable[ReferenceData]]) -> ReferenceData:
+        if (reference_data := self._reference_data) is not None:
+            return reference_data
+        async with self._lock:
+            if self._reference_data is None:
+                version = self._version
+                reference_data = await load()
+                # an ingest that lands while loading makes this snapshot stale, so it is used once and not kept
+                if version != self._version:
+                    return reference_data
+                self._reference_data = reference_data
+            return self._reference_data
@@ -9,8 +9,10 @@ from pydantic import Field
 
 from src.shared.utils.emoji import COUNTRIES_TO_FLAGS_MAP
 from src.shared.utils.insults import get_insult
+from src.shared.utils.render import get_render_cache
 from src.shared.utils.telegram import telegram_tag
 from src.shared.utils.time import date_to_str
+from src.shared.utils.time import get_utc_now
 
 
 class SweepstakeCategoryIDEnum(StrEnum):
@@ -48,6 +50,36 @@ class SweepstakeCategory(BaseModel):
         )
 
 
+class SweepstakeStanding(BaseModel):
+    id: Annotated[SweepstakeCategoryIDEnum, Field()]
+    prize_money: Annotated[int, Field()]
+    football_api_team_id: Annotated[int | None, Field()] = None
+    data: Annotated[str | None, Field()] = None
+
+
+class SweepstakeStandingChange(BaseModel):
+    category: SweepstakeCategory
+    previous_team: Annotated[Team | None, Field()] = None
+    previous_user: Annotated[User | None, Field()] = None
+
+    @property
+    def message(self) -> str:
+        return (
+            "🔄 {id} has changed hands 🔄\n"
+            "👥 {previous_user_telegram_tag} ➡️ {user_telegram_tag} 🎉\n"
+            "🤝 {previous_team_name} ➡️ {team_name} {team_emoji}\n"
+            "{data}"
+        ).format(
+            id=self.category.id,
+            previous_user_telegram_tag=self.previous_user.telegram_tag if self.previous_user else "TBD",
+            user_telegram_tag=self.category.user.telegram_tag if self.category.user else "TBD",
+            previous_team_name=self.previous_team.name if self.previous_team else "TBD",
+            team_name=self.category.team.name if self.category.team else "TBD",
+            team_emoji=self.category.team.emoji if self.category.team else "",
+            data=f"📊 Data: {self.category.data} ℹ️\n" if self.category.data else "",
+        )
+
+
 class SweepstakeContext(BaseModel):
     categories: list[SweepstakeCategory]
 
@@ -56,6 +88,23 @@ class SweepstakeContext(BaseModel):
         return "\n".join([c.message for c in self.categories])
 
 
+class IngestResult(BaseModel):
+    inserted: Annotated[int, Field()] = 0
+    updated: Annotated[int, Field()] = 0
+    unchanged: Annotated[int, Field()] = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated)
+
+    def __add__(self, other: IngestResult) -> IngestResult:
+        return IngestResult(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+        )
+
+
 def get_verb(score1: int, score2: int) -> str:
     if score1 == score2:
         return "drew with"
@@ -181,8 +230,8 @@ class UserContext(BaseModel):
 
 class FixtureContext(BaseModel):
     fixture: Fixture
-    home_user: User
-    away_user: User
+    home_user: User | None
+    away_user: User | None
     home_team: Team
     away_team: Team
 
@@ -222,6 +271,14 @@ class FixtureContext(BaseModel):
             return self.away_user
         return self.away_user
 
+    @property
+    def home_user_telegram_tag(self) -> str:
+        return self.home_user.telegram_tag if self.home_user else "TBD"
+
+    @property
+    def away_user_telegram_tag(self) -> str:
+        return self.away_user.telegram_tag if self.away_user else "TBD"
+
     @property
     def winning_or_home_team_goals(self) -> int | None:
         if self.winning_or_home_team.football_api_team_id == self.fixture.home_team_football_api_team_id:
@@ -238,8 +295,43 @@ class FixtureContext(BaseModel):
             return self.fixture.away_team_goals
         return self.fixture.away_team_goals
 
+    def get_render_key(self, kind: str) -> tuple | None:
+        # the fingerprint changes whenever ingest changes the fixture, today's date is in there for "Today"/"Tomorrow"
+        if self.fixture.fingerprint is None:
+            return None
+        return (
+            kind,
+            self.fixture.football_api_fixture_id,
+            self.fixture.status,
+            self.fixture.fingerprint,
+            self.home_team.name,
+            self.away_team.name,
+            self.home_user_telegram_tag,
+            self.away_user_telegram_tag,
+            get_utc_now().date(),
+        )
+
+    def render(self, kind: str, render_message: callable) -> str:
+        if (key := self.get_render_key(kind)) is None:
+            return render_message()
+        return get_render_cache().get(key, render_message)
+
     @property
     def not_started_message(self) -> str:
+        return self.render("not_started", self.render_not_started_message)
+
+    @property
+    def in_progress_message(self) -> str:
+        return self.render("in_progress", self.render_in_progress_message)
+
+    @property
+    def is_finished_message(self) -> str:
+        # the insult is only put into the cached message here, so that it is a different one every time
+        return self.render("is_finished", self.render_is_finished_message).replace(
+            "{verb}", f"<i>{get_insult()}ed</i>", 1
+        )
+
+    def render_not_started_message(self) -> str:
         return (
             "🤝 Teams: {home_team_name} {home_team_emoji} play {away_team_name} {away_team_emoji}\n"
             "🏟️ Stadium: {venue_name} in {venue_city} 🧑‍🤝‍🧑\n"
@@ -256,12 +348,11 @@ class FixtureContext(BaseModel):
             kick_off_time=self.fixture.kick_off.time(),
             kick_off_date=date_to_str(self.fixture.kick_off.date()),
             round=self.fixture.round,
-            home_user_telegram_tag=self.home_user.telegram_tag,
-            away_user_telegram_tag=self.away_user.telegram_tag,
+            home_user_telegram_tag=self.home_user_telegram_tag,
+            away_user_telegram_tag=self.away_user_telegram_tag,
         )
 
-    @property
-    def in_progress_message(self) -> str:
+    def render_in_progress_message(self) -> str:
         return (
             "🤝 Teams: {home_team_name} {home_team_emoji} are playing {away_team_name} {away_team_emoji} now\n"
             "🏟️ Score: {home_team_goals}-{away_team_goals} 🧑‍🤝‍🧑\n"
@@ -275,28 +366,29 @@ class FixtureContext(BaseModel):
             home_team_goals=self.fixture.home_team_goals,
             away_team_goals=self.fixture.away_team_goals,
             round=self.fixture.round,
-            home_user_telegram_tag=self.home_user.telegram_tag,
-            away_user_telegram_tag=self.away_user.telegram_tag,
+            home_user_telegram_tag=self.home_user_telegram_tag,
+            away_user_telegram_tag=self.away_user_telegram_tag,
         )
 
-    @property
-    def is_finished_message(self) -> str:
+    def render_is_finished_message(self) -> str:
+        winning_team = self.winning_or_home_team
+        losing_team = self.losing_or_away_team
         return (
             "🏆 Teams: {winning_team_name} {winning_team_emoji} {verb} {losing_team_name} {losing_team_emoji} ✨\n"
             "🏟️ Score: {winning_team_goals}-{losing_team_goals} 🧑‍🤝‍🧑\n"
             "🔢 Round: {round} 💫\n"
             "🎉 Well done {winning_user_telegram_tag} and get rekt {losing_user_telegram_tag} 💀"
         ).format(
-            winning_team_name=self.winning_or_home_team.name,
-            winning_team_emoji=self.winning_or_home_team.emoji,
+            winning_team_name=winning_team.name,
+            winning_team_emoji=winning_team.emoji,
             winning_team_goals=self.winning_or_home_team_goals,
-            verb=f"<i>{get_insult()}ed</i>" if not self.is_draw else "drew with",
-            losing_team_name=self.losing_or_away_team.name,
-            losing_team_emoji=self.losing_or_away_team.emoji,
+            verb="{verb}" if not self.is_draw else "drew with",
+            losing_team_name=losing_team.name,
+            losing_team_emoji=losing_team.emoji,
             losing_team_goals=self.losing_or_away_teams_goals,
             round=self.fixture.round,
-            winning_user_telegram_tag=self.winning_or_home_user.telegram_tag,
-            losing_user_telegram_tag=self.losing_or_away_user.telegram_tag,
+            winning_user_telegram_tag=self.winning_or_home_user.telegram_tag if self.winning_or_home_user else "TBD",
+            losing_user_telegram_tag=self.losing_or_away_user.telegram_tag if self.losing_or_away_user else "TBD",
         )
 
     @property
@@ -333,6 +425,17 @@ class Team(BaseModel):
         return f"{self.emoji} {self.name} {self.emoji}"
 
 
+class TeamStats(BaseModel):
+    team: Annotated[Team, Field()]
+    user: Annotated[User, Field()]
+    losses: Annotated[int, Field()] = 0
+    goals_scored: Annotated[int, Field()] = 0
+    goals_conceded: Annotated[int, Field()] = 0
+    yellow_cards: Annotated[int, Field()] = 0
+    yellow_then_red_cards: Annotated[int, Field()] = 0
+    red_cards: Annotated[int, Field()] = 0
+
+
 class Draw(BaseModel):
     telegram_api_user_id: Annotated[int, Field()]
     football_api_team_id: Annotated[int, Field()]
@@ -385,3 +488,20 @@ class Fixture(BaseModel):
     home_goals_extra_time: Annotated[int | None, Field()]
     home_goals_penalties: Annotated[int | None, Field()]
     away_goals_penalties: Annotated[int | None, Field()]
+    fingerprint: Annotated[str | None, Field()] = None
+    events_fingerprint: Annotated[str | None, Field()] = None
+
+
+class FixtureEvent(BaseModel):
+    football_api_fixture_id: Annotated[int, Field()]
+    sequence: Annotated[int, Field()]
+    elapsed: Annotated[int, Field()]
+    extra: Annotated[int | None, Field()]
+    football_api_team_id: Annotated[int, Field()]
+    football_api_player_id: Annotated[int | None, Field()]
+    player_name: Annotated[str | None, Field()]
+    assist_football_api_player_id: Annotated[int | None, Field()]
+    assist_name: Annotated[str | None, Field()]
+    type: Annotated[str | None, Field()]
+    detail: Annotated[str | None, Field()]
+    comments: Annotated[str | None, Field()]
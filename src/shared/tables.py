@@ -1,26 +1,42 @@
 from __future__ import annotations
 
 import datetime
+import hashlib
+import json
+from typing import Any
+
 from pyrogram.types import User as PyrogramUser
 from sqlalchemy import BigInteger
 from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import text
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 
+from src.adapters.football_api.models import GETFixturesEventResponse
 from src.adapters.football_api.models import GETFixturesResponse
 from src.adapters.football_api.models import GETPlayerResponse
 from src.adapters.football_api.models import GETTeamInformationResponse
 from src.shared.models import Draw
 from src.shared.models import Fixture
+from src.shared.models import FixtureEvent
 from src.shared.models import Player
+from src.shared.models import SweepstakeStanding
 from src.shared.models import Team
 from src.shared.models import User
 
 
 class BaseTable(DeclarativeBase):
-    pass
+    def to_dict(self) -> dict[str, Any]:
+        return {column.name: getattr(self, column.key) for column in self.__table__.columns}
+
+    def get_fingerprint(self) -> str:
+        values = self.to_dict()
+        for key in ("fingerprint", "events_fingerprint"):
+            values.pop(key, None)
+        return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
 
 
 class UserTable(BaseTable):
@@ -67,7 +83,10 @@ class DrawTable(BaseTable):
     __tablename__ = "draw"
 
     telegram_api_user_id: Mapped[int] = mapped_column(ForeignKey("user.telegram_api_user_id"), primary_key=True)
-    football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"), primary_key=True)
+    # second in the primary key, so looking up who drew a team needs its own index
+    football_api_team_id: Mapped[int] = mapped_column(
+        ForeignKey("team.football_api_team_id"), primary_key=True, index=True
+    )
 
     def to_model(self) -> Draw:
         return Draw.model_validate(self, from_attributes=True)
@@ -75,20 +94,29 @@ class DrawTable(BaseTable):
 
 class PlayerTable(BaseTable):
     __tablename__ = "player"
+    __table_args__ = (
+        # only goalscorers are ever ranked by age
+        Index(
+            "ix_player_goalscorer_date_of_birth",
+            "date_of_birth",
+            postgresql_where=text("goals IS NOT NULL AND goals <> 0"),
+        ),
+    )
 
     football_api_player_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     first_name: Mapped[str]
     last_name: Mapped[str]
     date_of_birth: Mapped[datetime.date]
-    football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"))
+    football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"), index=True)
     yellow_cards: Mapped[int | None]
     yellow_then_red_cards: Mapped[int | None]
     red_cards: Mapped[int | None]
     goals: Mapped[int | None]
+    fingerprint: Mapped[str | None]
 
     @classmethod
     def from_football_api_player_response(cls, response: GETPlayerResponse) -> PlayerTable:
-        return cls(
+        player = cls(
             football_api_player_id=response["player"]["id"],
             first_name=response["player"]["firstname"],
             last_name=response["player"]["lastname"],
@@ -99,6 +127,8 @@ class PlayerTable(BaseTable):
             red_cards=response["statistics"][0]["cards"]["red"],
             goals=response["statistics"][0]["goals"]["total"],
         )
+        player.fingerprint = player.get_fingerprint()
+        return player
 
     def to_model(self) -> Player:
         return Player.model_validate(self, from_attributes=True)
@@ -107,18 +137,26 @@ class PlayerTable(BaseTable):
 #
 class FixtureTable(BaseTable):
     __tablename__ = "fixture"
+    __table_args__ = (
+        # the fixtures whose events still have to be ingested, by kick off
+        Index(
+            "ix_fixture_stale_events_kick_off",
+            "kick_off",
+            postgresql_where=text("events_fingerprint IS DISTINCT FROM fingerprint"),
+        ),
+    )
 
     football_api_fixture_id: Mapped[int] = mapped_column(primary_key=True)
-    status: Mapped[str]
-    home_team_football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"))
-    away_team_football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"))
+    status: Mapped[str] = mapped_column(index=True)
+    home_team_football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"), index=True)
+    away_team_football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"), index=True)
     home_team: Mapped[str]
     away_team: Mapped[str]
     home_team_goals: Mapped[int | None]
     away_team_goals: Mapped[int | None]
     home_team_winner: Mapped[bool | None]
     away_team_winner: Mapped[bool | None]
-    kick_off: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+    kick_off: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), index=True)
     venue_city: Mapped[str]
     venue_name: Mapped[str]
     round: Mapped[str]
@@ -130,10 +168,13 @@ class FixtureTable(BaseTable):
     home_goals_extra_time: Mapped[int | None]
     home_goals_penalties: Mapped[int | None]
     away_goals_penalties: Mapped[int | None]
+    fingerprint: Mapped[str | None]
+    # the fingerprint the fixture had when its events were last ingested
+    events_fingerprint: Mapped[str | None]
 
     @classmethod
     def from_football_api_fixture_response(cls, response: GETFixturesResponse) -> FixtureTable:
-        return cls(
+        fixture = cls(
             football_api_fixture_id=response["fixture"]["id"],
             status=response["fixture"]["status"]["short"],
             home_team_football_api_team_id=response["teams"]["home"]["id"],
@@ -157,6 +198,95 @@ class FixtureTable(BaseTable):
             home_goals_penalties=response["score"]["penalty"]["home"],
             away_goals_penalties=response["score"]["penalty"]["away"],
         )
+        fixture.fingerprint = fixture.get_fingerprint()
+        return fixture
 
     def to_model(self) -> Fixture:
         return Fixture.model_validate(self, from_attributes=True)
+
+
+class BaseView(DeclarativeBase):
+    # views are created by hand in the migrations, so they live outside BaseTable.metadata, where neither
+    # create_all nor autogenerate can turn them into tables
+    pass
+
+
+class TeamStatsView(BaseView):
+    # a materialized view maintained by the migrations, refreshed after fixtures or players are ingested
+    __tablename__ = "team_stats"
+
+    football_api_team_id: Mapped[int] = mapped_column(primary_key=True)
+    losses: Mapped[int]
+    goals_scored: Mapped[int]
+    goals_conceded: Mapped[int]
+    yellow_cards: Mapped[int]
+    yellow_then_red_cards: Mapped[int]
+    red_cards: Mapped[int]
+    biggest_defeat_football_api_fixture_id: Mapped[int | None]
+    biggest_defeat_goal_difference: Mapped[int | None]
+    biggest_defeat_goals_total: Mapped[int | None]
+
+
+class SweepstakeStandingTable(BaseTable):
+    __tablename__ = "sweepstake_standing"
+
+    id: Mapped[str] = mapped_column(primary_key=True)
+    prize_money: Mapped[int]
+    football_api_team_id: Mapped[int | None] = mapped_column(ForeignKey("team.football_api_team_id"))
+    data: Mapped[str | None]
+    fingerprint: Mapped[str | None]
+
+    @classmethod
+    def from_sweepstake_standing(cls, standing: SweepstakeStanding) -> SweepstakeStandingTable:
+        sweepstake_standing = cls(
+            id=standing.id,
+            prize_money=standing.prize_money,
+            football_api_team_id=standing.football_api_team_id,
+            data=standing.data,
+        )
+        sweepstake_standing.fingerprint = sweepstake_standing.get_fingerprint()
+        return sweepstake_standing
+
+    def to_model(self) -> SweepstakeStanding:
+        return SweepstakeStanding.model_validate(self, from_attributes=True)
+
+
+class FixtureEventTable(BaseTable):
+    __tablename__ = "fixture_event"
+
+    football_api_fixture_id: Mapped[int] = mapped_column(
+        ForeignKey("fixture.football_api_fixture_id"), primary_key=True
+    )
+    sequence: Mapped[int] = mapped_column(primary_key=True)
+    elapsed: Mapped[int]
+    extra: Mapped[int | None]
+    football_api_team_id: Mapped[int] = mapped_column(ForeignKey("team.football_api_team_id"), index=True)
+    football_api_player_id: Mapped[int | None] = mapped_column(BigInteger, index=True)
+    player_name: Mapped[str | None]
+    assist_football_api_player_id: Mapped[int | None] = mapped_column(BigInteger)
+    assist_name: Mapped[str | None]
+    type: Mapped[str | None]
+    detail: Mapped[str | None]
+    comments: Mapped[str | None]
+
+    @classmethod
+    def from_football_api_fixture_event_response(
+        cls, football_api_fixture_id: int, sequence: int, response: GETFixturesEventResponse
+    ) -> FixtureEventTable:
+        return cls(
+            football_api_fixture_id=football_api_fixture_id,
+            sequence=sequence,
+            elapsed=response["time"]["elapsed"],
+            extra=response["time"]["extra"],
+            football_api_team_id=response["team"]["id"],
+            football_api_player_id=response["player"]["id"],
+            player_name=response["player"]["name"],
+            assist_football_api_player_id=response["assist"]["id"],
+            assist_name=response["assist"]["name"],
+            type=response["type"],
+            detail=response["detail"],
+            comments=response["comments"],
+        )
+
+    def to_model(self) -> FixtureEvent:
+        return FixtureEvent.model_validate(self, from_attributes=True)
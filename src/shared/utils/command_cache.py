@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+
+from pydantic import BaseModel
+
+
+class CommandCacheMetrics(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+
+class CommandCache:
+    ttl: float
+    metrics: CommandCacheMetrics
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.metrics = CommandCacheMetrics()
+
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._keys_by_table: dict[str, set[Hashable]] = {}
+        self._version = 0
+
+    async def get(self, key: Hashable, tables: list[str], load: Callable[[], Awaitable[Any]]) -> Any:
+        if (entry := self._entries.get(key)) is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self.metrics.hits += 1
+                return value
+
+        self.metrics.misses += 1
+        version = self._version
+        value = await load()
+        # whatever was written while loading may be missing from the value, so it is served once but not kept
+        if version == self._version:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+        return value
+
+    def invalidate(self, *tables: str) -> None:
+        self._version += 1
+        for table in tables:
+            for key in self._keys_by_table.pop(table, set()):
+                if self._entries.pop(key, None) is not None:
+                    self.metrics.invalidations += 1
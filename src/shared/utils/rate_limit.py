@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+
+from src.shared.utils.time import get_utc_now
+
+
+class DailyLimitReached(Exception): ...
+
+
+def parse_retry_after(retry_after: str | None) -> float | None:
+    # either a number of seconds or an http date, anything else is ignored
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(retry_after) - get_utc_now()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    max_rate: float
+    min_rate: float
+    rate: float
+    capacity: float
+    tokens: float
+    refilled_at: float
+
+    daily_limit: int | None
+    used_today: int
+    today: str
+
+    def __init__(self, rate: float, daily_limit: int | None = None, capacity: float | None = None) -> None:
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.refilled_at = time.monotonic()
+
+        self.daily_limit = daily_limit
+        self.used_today = 0
+        self.today = str(get_utc_now().date())
+
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            if (today := str(get_utc_now().date())) != self.today:
+                self.today = today
+                self.used_today = 0
+            if self.daily_limit is not None and self.used_today >= self.daily_limit:
+                raise DailyLimitReached(f"{self.used_today} of {self.daily_limit} requests used today")
+
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+            self.used_today += 1
+
+    def slow_down(self, retry_after: float | None = None) -> None:
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        # going into debt holds back every waiter, not just the request that got throttled
+        self.tokens = min(self.tokens, 0) - (retry_after or 0) * self.rate
+
+    def speed_up(self) -> None:
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 16)
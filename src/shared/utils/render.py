@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable
+from typing import Hashable
+
+RENDER_CACHE_SIZE = 1024
+
+
+@lru_cache
+def get_render_cache() -> RenderCache:
+    return RenderCache(RENDER_CACHE_SIZE)
+
+
+class RenderCache:
+    max_size: int
+    hits: int
+    misses: int
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._rendered: OrderedDict[Hashable, str] = OrderedDict()
+
+    def get(self, key: Hashable, render: Callable[[], str]) -> str:
+        if (rendered := self._rendered.get(key)) is not None:
+            self._rendered.move_to_end(key)
+            self.hits += 1
+            return rendered
+
+        self.misses += 1
+        rendered = self._rendered[key] = render()
+        if len(self._rendered) > self.max_size:
+            self._rendered.popitem(last=False)
+        return rendered
+
+    def clear(self) -> None:
+        self._rendered.clear()
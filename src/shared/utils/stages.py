@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from enum import StrEnum
+from graphlib import TopologicalSorter
+from typing import Annotated
+from typing import Awaitable
+from typing import Callable
+
+from loguru import logger
+from pydantic import BaseModel
+from pydantic import Field
+
+
+class StageStatusEnum(StrEnum):
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class Stage(BaseModel):
+    func: Annotated[Callable[[], Awaitable[None]], Field()]
+    depends_on: Annotated[list[str], Field()] = []
+
+
+class StageResult(BaseModel):
+    name: Annotated[str, Field()]
+    status: Annotated[StageStatusEnum, Field()]
+    seconds: Annotated[float, Field()] = 0
+    error: Annotated[str | None, Field()] = None
+
+
+async def run_stages(stages: dict[str, Stage]) -> dict[str, StageResult]:
+    # raises on unknown dependencies and cycles before anything runs
+    TopologicalSorter({name: stage.depends_on for name, stage in stages.items()}).prepare()
+    unknown = {dependency for stage in stages.values() for dependency in stage.depends_on} - set(stages)
+    if unknown:
+        raise ValueError(f"unknown stages: {unknown}")
+
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def run(name: str, stage: Stage) -> StageResult:
+        dependencies = [await tasks[dependency] for dependency in stage.depends_on]
+        if failed := [d.name for d in dependencies if d.status != StageStatusEnum.SUCCEEDED]:
+            logger.warning(f"skipping stage {name}, {failed} did not succeed")
+            return StageResult(name=name, status=StageStatusEnum.SKIPPED)
+
+        start = time.perf_counter()
+        try:
+            await stage.func()
+        except Exception as e:
+            logger.exception(f"stage {name} failed")
+            return StageResult(
+                name=name, status=StageStatusEnum.FAILED, seconds=time.perf_counter() - start, error=repr(e)
+            )
+        result = StageResult(name=name, status=StageStatusEnum.SUCCEEDED, seconds=time.perf_counter() - start)
+        logger.info(f"stage {name} finished in {result.seconds:.2f}s")
+        return result
+
+    for name, stage in stages.items():
+        tasks[name] = asyncio.create_task(run(name, stage))
+    return {name: await task for name, task in tasks.items()}
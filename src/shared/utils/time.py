@@ -6,9 +6,10 @@ def get_utc_now() -> datetime.datetime:
 
 
 def date_to_str(date: datetime.date) -> str:
-    if date == get_utc_now().date():
+    today = get_utc_now().date()
+    if date == today:
         return "Today"
-    elif date == get_utc_now().date() + datetime.timedelta(days=1):
+    elif date == today + datetime.timedelta(days=1):
         return "Tomorrow"
     else:
         return date.strftime("%a %b %d")